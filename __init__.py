@@ -14,6 +14,10 @@ from . import render_presets_panel
 from . import render_presets_preferences
 from . import render_presets_presets
 from .render_presets import RenderPresets
+from .render_presets_accessors import RenderPresetsAccessor
+from .render_presets_schema import RenderPresetsSchema
+from .render_presets_history import RenderPresetsHistory
+from .render_presets_workers import BatchRenderWorkers
 
 
 bl_info = {
@@ -32,8 +36,11 @@ bl_info = {
 @persistent
 def render_presets_load_presets_list(context, scene):
     # load presets list
+    #   scene backup and applied presets history belong to the previous scene
+    RenderPresets.clear_scene_backup()
+    RenderPresetsHistory.clear()
     if bpy.context:
-        RenderPresets.load_presets_list(context=bpy.context)
+        RenderPresets.load_presets_list(context=bpy.context, background=True)
     else:
         return 0.25
 
@@ -46,13 +53,18 @@ def register():
         render_presets_ops.register()
         render_presets_panel.register()
         # load presets list
-        bpy.app.timers.register(
-            functools.partial(render_presets_load_presets_list, bpy.context, None),
-            first_interval=0.25
-        )
+        #   not in background mode - there are no timers, presets list is loaded by the command line mode
+        if not bpy.app.background:
+            bpy.app.timers.register(
+                functools.partial(render_presets_load_presets_list, bpy.context, None),
+                first_interval=0.25
+            )
         # reload presets list with scene load
         if render_presets_load_presets_list not in bpy.app.handlers.load_post:
             bpy.app.handlers.load_post.append(render_presets_load_presets_list)
+        # watch presets directory for changes (stops itself if watching is disabled in preferences)
+        if not bpy.app.background:
+            RenderPresets.start_watching_presets_folder(first_interval=1.0)
     else:
         print(
             'It seems you are trying to use the dev version of the '
@@ -62,9 +74,14 @@ def register():
 
 def unregister():
     if not Addon.dev_mode():
+        BatchRenderWorkers.cancel()
+        RenderPresets.stop_watching_presets_folder()
         if render_presets_load_presets_list in bpy.app.handlers.load_post:
             bpy.app.handlers.load_post.remove(render_presets_load_presets_list)
         RenderPresets.clear_presets_list(context=bpy.context)
+        RenderPresetsAccessor.clear()
+        # schemas are built from RNA definitions - can be changed by the add-ons registered after re-enabling
+        RenderPresetsSchema.clear()
         render_presets_panel.unregister()
         render_presets_ops.unregister()
         render_presets_presets.unregister()
@@ -0,0 +1,207 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# B-Presets benchmarks
+#   synthetic presets libraries (10, 1000, 10000 presets, every 10-th preset with a large curve mapping)
+#   are generated in the temporary directory and the presets operations are timed on them
+#
+#   blender -b --factory-startup --python benchmarks/benchmark_presets.py -- [--sizes 10 1000 10000] [--runs 5]
+#       [--addon b_presets] [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+#
+#   results are printed and saved as json, with --baseline medians are compared with the baseline file
+#   and the exit code is 1 if some operation is slower than the baseline more than the threshold
+#   baseline is a results file saved earlier on the reference machine (no baselines are checked in yet)
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import addon_utils
+import bpy
+
+
+class PresetsBenchmark:
+
+    curve_points = 256      # points in each curve of the large curve mapping
+    large_curve_step = 10   # each n-th preset has the large curve mapping
+
+    def __init__(self, addon, runs):
+        self.addon = addon
+        self.runs = runs
+        self.context = bpy.context
+        self.render_presets = sys.modules[addon + '.render_presets'].RenderPresets
+        self.format = sys.modules[addon + '.render_presets_format'].RenderPresetsFormat
+        self.file_system = sys.modules[addon + '.render_presets_file_system'].RenderPresetsFileSystem
+        self.cache = sys.modules[addon + '.render_presets_cache'].RenderPresetsCache
+        self.preferences = self.context.preferences.addons[addon].preferences
+
+    def run(self, size):
+        # benchmark presets library with size presets
+        presets_dir = tempfile.mkdtemp(prefix='b_presets_benchmark_')
+        self.preferences.presets_dir = presets_dir
+        results = {}
+        try:
+            self._generate_library(presets_dir=presets_dir, size=size)
+            presets = self.context.window_manager.render_presets_presets
+            # presets list - without index (first load) and with index
+            results['load_presets_list_cold'] = self._time(
+                function=lambda: self.render_presets.load_presets_list(context=self.context),
+                before=lambda: (
+                    self.render_presets.clear_presets_list(context=self.context),
+                    self._remove_index(presets_dir=presets_dir)
+                )
+            )
+            results['load_presets_list'] = self._time(
+                function=lambda: self.render_presets.load_presets_list(context=self.context),
+                before=lambda: self.render_presets.clear_presets_list(context=self.context)
+            )
+            results['clear_presets_list'] = self._time(
+                function=lambda: self.render_presets.clear_presets_list(context=self.context),
+                before=lambda: self.render_presets.load_presets_list(context=self.context)
+            )
+            self.render_presets.load_presets_list(context=self.context)
+            results['_get_new_file_name'] = self._time(
+                function=lambda: self.render_presets._get_new_file_name(context=self.context)
+            )
+            results['add_new_preset'] = self._time(
+                function=lambda: self.render_presets.add_new_preset(context=self.context)
+            )
+            # presets with the regular and with the large curve mapping
+            for suffix, preset_id in (('', 1), ('_large_curve', 0)):
+                preset = presets[self._preset_name(preset_id=preset_id)]
+                results['preset_to_scene' + suffix + '_cold'] = self._time(
+                    function=lambda: self.render_presets.preset_to_scene(context=self.context, preset=preset),
+                    before=self.cache.clear
+                )
+                results['preset_to_scene' + suffix] = self._time(
+                    function=lambda: self.render_presets.preset_to_scene(context=self.context, preset=preset)
+                )
+                results['scene_to_preset' + suffix] = self._time(
+                    function=lambda: self.render_presets.scene_to_preset(context=self.context, preset=preset)
+                )
+        finally:
+            self.render_presets.clear_presets_list(context=self.context)
+            self.cache.clear()
+            shutil.rmtree(presets_dir, ignore_errors=True)
+        return results
+
+    def _generate_library(self, presets_dir, size):
+        # generate presets files from the current scene
+        #   presets differ by the resolution, each large_curve_step preset has the large curve mapping
+        preset_data = self.render_presets.preset_data_from_scene(context=self.context)
+        self._make_large_curve_mapping()
+        large_curve_preset_data = self.render_presets.preset_data_from_scene(context=self.context)
+        file_ext = self.format.file_ext(file_format=self.preferences.preset_file_format)
+        for preset_id in range(size):
+            data = large_curve_preset_data if preset_id % self.large_curve_step == 0 else preset_data
+            data['attributes']['context.scene.render.resolution_percentage'] = preset_id % 100 + 1
+            self.file_system.write_atomic(
+                file_path=os.path.join(presets_dir, self._preset_name(preset_id=preset_id) + '.' + file_ext),
+                content=self.format.dumps(preset_data=data, file_format=self.preferences.preset_file_format)
+            )
+
+    def _make_large_curve_mapping(self):
+        # add points to the scene color management curve mapping
+        view_settings = self.context.scene.view_settings
+        view_settings.use_curve_mapping = True
+        for curve in view_settings.curve_mapping.curves:
+            for point_id in range(len(curve.points), self.curve_points):
+                curve.points.new(point_id / self.curve_points, (point_id / self.curve_points) ** 2)
+        view_settings.curve_mapping.update()
+
+    def _time(self, function, before=None):
+        # function execution time statistics (ms)
+        times = []
+        for _ in range(self.runs):
+            if before:
+                before()
+            start_time = time.perf_counter()
+            function()
+            times.append((time.perf_counter() - start_time) * 1000)
+        return {
+            'runs': self.runs,
+            'min': min(times),
+            'median': statistics.median(times),
+            'mean': statistics.mean(times),
+            'max': max(times)
+        }
+
+    @staticmethod
+    def _preset_name(preset_id):
+        # synthetic preset name
+        return 'benchmark.' + str(preset_id).zfill(5)
+
+    @staticmethod
+    def _remove_index(presets_dir):
+        # remove presets index to benchmark the first presets list loading
+        for file_name in os.listdir(presets_dir):
+            if file_name.startswith('.b_presets_index'):
+                os.remove(os.path.join(presets_dir, file_name))
+
+
+def compare_with_baseline(results, baseline, threshold):
+    # operations which median time is more than the baseline median by threshold, [(size, operation, ratio), ...]
+    regressions = []
+    for size, operations in results['results'].items():
+        for operation, stats in operations.items():
+            baseline_stats = baseline.get('results', {}).get(size, {}).get(operation)
+            if baseline_stats and baseline_stats['median'] > 0:
+                ratio = stats['median'] / baseline_stats['median']
+                if ratio > 1 + threshold:
+                    regressions.append((size, operation, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='blender -b --python benchmark_presets.py --')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--addon', default=os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    parser.add_argument('--output', default='b_presets_benchmark.json')
+    parser.add_argument('--baseline')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args(sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else [])
+    # add-on from this repository
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    addon_utils.enable(args.addon, default_set=True)
+    if args.addon not in bpy.context.preferences.addons or bpy.context.preferences.addons[args.addon].preferences is None:
+        print('ERR: add-on ' + args.addon + ' is not registered (dev mode in cfg.json?)')
+        return 1
+    benchmark = PresetsBenchmark(addon=args.addon, runs=args.runs)
+    results = {
+        'blender': bpy.app.version_string,
+        'addon_version': '.'.join(str(number) for number in sys.modules[args.addon].bl_info['version']),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'preset_file_format': benchmark.preferences.preset_file_format,
+        'results': {}
+    }
+    for size in args.sizes:
+        results['results'][str(size)] = benchmark.run(size=size)
+        for operation, stats in results['results'][str(size)].items():
+            print(str(size).rjust(6) + ' ' + operation.ljust(40) + ' ' + str(round(stats['median'], 3)) + ' ms')
+    with open(file=args.output, mode='w', encoding='utf8') as output_file:
+        json.dump(results, output_file, indent=4)
+    print('Results saved: ' + os.path.abspath(args.output))
+    if args.baseline:
+        with open(file=args.baseline, mode='r', encoding='utf8') as baseline_file:
+            regressions = compare_with_baseline(results=results, baseline=json.load(baseline_file), threshold=args.threshold)
+        for size, operation, ratio in regressions:
+            print('REGRESSION: ' + str(size) + ' ' + operation + ' x' + str(round(ratio, 2)))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    rez = main()
+    if rez:
+        sys.exit(rez)
@@ -4,48 +4,202 @@
 # GitHub
 #   https://github.com/Korchy/blender_b_presets
 
-import json
 import os
-from mathutils import Vector, Color
-from bpy.types import bpy_prop_array, CurveMapping, EnumProperty
+import bpy
+from bpy.types import EnumProperty
+from .render_presets_accessors import RenderPresetsAccessor
 from .render_presets_bl_types_conversion import BLCurveMapping, BLSet
+from .render_presets_cache import RenderPresetsCache
 from .render_presets_file_system import RenderPresetsFileSystem
+from .render_presets_format import RenderPresetsFormat
+from .render_presets_index import RenderPresetsIndex
+from .render_presets_profiler import RenderPresetsProfiler
+from .render_presets_registry import RenderPresetsRegistry
+from .render_presets_scanner import RenderPresetsScanner
+from .render_presets_schema import RenderPresetsSchema
+from .render_presets_timings import RenderPresetsTimings
 
 
 class RenderPresets:
 
     _presets_folder = 'presets'
     _preset_file_name = 'preset'
-    _preset_file_ext = 'json'
-    _scene_backup = None
+    _scene_journal = None
     _camera_backup = None
+    # globally first - this attributes influence on attributes from other data sections
+    # (image_settings.file_format - ffmpeg section)
+    _preordered_attributes = (
+        'context.scene.render.image_settings.file_format',
+    )
+    defaults_preset_name = '<defaults>'     # '<' is not allowed in preset names
+    _defaults_preset_data = None
+    last_applied_count = 0
+    _synced_presets = set()
+    _synced_active_preset = ''
+    _synced_presets_folder_path = None
+    _presets_folder_mtime = None
+    _watch_timer = None     # registered watcher timer - timers are matched by the function object
+    _new_file_name_postfix = 0      # last allocated preset file name postfix
+    _new_file_name_folder_path = None
+    # attributes sections - presets can capture and apply only some of them
+    sections = ('SCENE', 'RENDER', 'COLOR_MANAGEMENT', 'WORLD', 'VIEWPORT', 'VIEW_LAYER')
+    # sections by the attributes owners, nested owners are in the section of the nearest listed parent
+    #   (context.scene.render.bake - RENDER)
+    _sections_owners = {
+        'context.scene': 'SCENE',
+        'context.scene.render': 'RENDER',
+        'context.scene.hydra': 'RENDER',
+        'context.scene.cycles': 'RENDER',
+        'context.scene.cycles_curves': 'RENDER',
+        'context.scene.eevee': 'RENDER',
+        'context.scene.display': 'RENDER',
+        'context.scene.grease_pencil_settings': 'RENDER',
+        'context.scene.view_settings': 'COLOR_MANAGEMENT',
+        'context.scene.display_settings': 'COLOR_MANAGEMENT',
+        'context.scene.sequencer_colorspace_settings': 'COLOR_MANAGEMENT',
+        'context.scene.world': 'WORLD',
+        'context.space_data': 'VIEWPORT',
+        'context.view_layer': 'VIEW_LAYER'
+    }
+    _owners_sections = {}   # owner path: section, for all met owners
 
     @classmethod
-    def load_presets_list(cls, context):
+    @RenderPresetsProfiler.profiled
+    def load_presets_list(cls, context, background=False):
         # load presets list
-        # clear current
-        cls.clear_presets_list(context=context)
+        #   presets list is synchronized with preset files: new presets are added, removed - removed,
+        #   existed - updated only if changed, so the active preset and checked flags are kept
+        #   background - scan presets folder in the worker thread and fill the list by portions
+        presets = context.window_manager.render_presets_presets
+        # the list can be restored with the .blend file - start from its current state
+        RenderPresetsRegistry.rebuild(presets=presets)
+        active_preset_id = context.window_manager.render_presets_active_preset
+        cls._synced_active_preset = presets[active_preset_id].name if 0 <= active_preset_id < len(presets) else ''
+        cls._synced_presets = set()
+        cls._synced_presets_folder_path = cls._presets_folder_path(context=context)
         # load new from files
-        for file in cls._presets_files(context=context):
-            preset = context.window_manager.render_presets_presets.add()
-            preset.name = os.path.splitext(file)[0]
-            preset_data = cls._preset_data_from_file(
-                context=context,
-                preset_file_name=file
+        #   only locked, camera and render animation are needed for the list - get them from the presets index
+        if background and not bpy.app.background:
+            RenderPresetsScanner.start(
+                presets_folder_path=cls._synced_presets_folder_path,
+                files_ext=cls._presets_files_ext(),
+                on_entry=cls._sync_preset_item,
+                on_finish=cls._sync_presets_list_finish
             )
-            if preset_data:
-                preset.locked = preset_data['locked']
-                preset.camera = cls._object_by_name(
+        else:
+            for file_name, index_entry in RenderPresetsIndex.entries(
+                    presets_folder_path=cls._synced_presets_folder_path,
+                    files=cls._presets_files(context=context)
+            ):
+                cls._sync_preset_item(
                     context=context,
-                    object_name=preset_data['camera_name']
+                    file_name=file_name,
+                    index_entry=index_entry
                 )
+            cls._sync_presets_list_finish(context=context)
+
+    @classmethod
+    def _sync_preset_item(cls, context, file_name, index_entry):
+        # add preset to the presets list or update existing preset
+        presets = context.window_manager.render_presets_presets
+        preset_name = os.path.splitext(file_name)[0]
+        cls._synced_presets.add(preset_name)
+        preset = presets.get(preset_name)
+        if preset is None:
+            # added to the end, list is sorted when all presets are synced
+            preset = presets.add()
+            preset.name = preset_name
+        if index_entry:
+            camera = cls._object_by_name(
+                context=context,
+                object_name=index_entry['camera_name']
+            )
+            # old presets without sections - all sections
+            sections = set(index_entry['sections'] or cls.sections)
+            if not preset.loaded or preset.locked != index_entry['locked'] or preset.camera != camera \
+                    or preset.render_animation != index_entry['render_animation'] \
+                    or preset.sections != sections:
+                # not loaded - to not write changes back to the preset file
+                preset.loaded = False
+                preset.locked = index_entry['locked']
+                preset.camera = camera
+                preset.render_animation = index_entry['render_animation']
+                preset.sections = sections
                 preset.loaded = True
 
     @classmethod
-    def add_new_preset(cls, context):
+    def _sync_presets_list_finish(cls, context):
+        # remove presets which files were removed and restore active preset
+        presets = context.window_manager.render_presets_presets
+        for preset_id in reversed(range(len(presets))):
+            if presets[preset_id].name not in cls._synced_presets:
+                RenderPresetsRegistry.remove(name=presets[preset_id].name)
+                presets.remove(preset_id)
+        cls._sort_presets_list(context=context)
+        active_preset_id = presets.find(cls._synced_active_preset)
+        if active_preset_id >= 0:
+            context.window_manager.render_presets_active_preset = active_preset_id
+        cls._presets_folder_mtime = cls._folder_mtime(folder_path=cls._synced_presets_folder_path)
+
+    @classmethod
+    def watch_presets_folder(cls):
+        # timer - reload presets list if presets were changed in the presets folder (by other users)
+        #   preset files are saved with replacing so any change also changes the folder mtime
+        context = bpy.context
+        if __package__ not in context.preferences.addons \
+                or not context.preferences.addons[__package__].preferences.watch_presets_dir:
+            return None
+        preferences = context.preferences.addons[__package__].preferences
+        if not RenderPresetsScanner.is_running() \
+                and cls._folder_mtime(folder_path=cls._presets_folder_path(context=context)) != cls._presets_folder_mtime:
+            cls.load_presets_list(context=context, background=True)
+        return preferences.watch_presets_dir_interval
+
+    @classmethod
+    def start_watching_presets_folder(cls, first_interval):
+        # register presets folder watcher timer if it is not registered yet
+        if cls._watch_timer is None or not bpy.app.timers.is_registered(cls._watch_timer):
+            cls._watch_timer = cls.watch_presets_folder
+            bpy.app.timers.register(cls._watch_timer, first_interval=first_interval, persistent=True)
+
+    @classmethod
+    def stop_watching_presets_folder(cls):
+        # unregister presets folder watcher timer
+        if cls._watch_timer is not None and bpy.app.timers.is_registered(cls._watch_timer):
+            bpy.app.timers.unregister(cls._watch_timer)
+        cls._watch_timer = None
+
+    @staticmethod
+    def _folder_mtime(folder_path):
+        # returns folder modification time
+        try:
+            return os.stat(folder_path).st_mtime_ns
+        except OSError:
+            return None
+
+    @classmethod
+    def add_new_preset(cls, context, parent=''):
         # Create new preset
-        preset_file_name = cls._get_new_file_name(context=context)
-        preset_data = cls.preset_data_from_scene(context=context)
+        #   if parent is set - only attributes different from the parent preset are saved,
+        #   sections are the same as in the parent preset
+        sections = None
+        if parent:
+            parent_preset_data = cls._preset_data_resolved(
+                context=context,
+                preset_name=parent
+            )
+            sections = parent_preset_data.get('sections') if parent_preset_data else None
+        preset_data = cls.preset_data_from_scene(
+            context=context,
+            sections=sections
+        )
+        if parent:
+            preset_data = cls._preset_data_delta(
+                context=context,
+                preset_data=preset_data,
+                parent=parent
+            )
+        preset_file_name = cls._reserve_new_file_name(context=context)
         cls._preset_data_to_file(
             context=context,
             preset_file_name=preset_file_name,
@@ -54,53 +208,227 @@ class RenderPresets:
         # add to list
         new_preset = context.window_manager.render_presets_presets.add()
         new_preset.name = os.path.splitext(preset_file_name)[0]
+        new_preset.sections = set(preset_data['sections'])
         new_preset.loaded = True
+        cls._sort_presets_list(context=context)
+
+    @classmethod
+    def _sort_presets_list(cls, context):
+        # sort presets list alphabetically keeping the active preset
+        #   new presets are added to the end and renamed presets keep their places - only they are moved
+        presets = context.window_manager.render_presets_presets
+        names = presets.keys()
+        sorted_names = sorted(names)
+        if names != sorted_names:
+            active_preset_id = context.window_manager.render_presets_active_preset
+            active_preset_name = names[active_preset_id] if 0 <= active_preset_id < len(names) else ''
+            for preset_id, preset_name in enumerate(sorted_names):
+                current_id = names.index(preset_name, preset_id)
+                if current_id != preset_id:
+                    presets.move(current_id, preset_id)
+                    names.insert(preset_id, names.pop(current_id))
+            if active_preset_name:
+                context.window_manager.render_presets_active_preset = names.index(active_preset_name)
 
     @classmethod
     def remove_preset(cls, context, preset):
         # Remove active preset
         if not preset.locked:
+            # child presets inherit removed preset attributes
+            cls._flatten_child_presets(
+                context=context,
+                preset_name=preset.name
+            )
             # remove file
             file_path = os.path.join(
                 cls._presets_folder_path(context=context),
-                preset.name + '.' + cls._preset_file_ext
+                cls._preset_file_name_by_name(context=context, preset_name=preset.name)
             )
             if os.path.isfile(path=file_path):
                 os.remove(path=file_path)
+            RenderPresetsCache.remove(file_path=file_path)
             # remove item in list
+            RenderPresetsRegistry.remove(name=preset.name)
             context.window_manager.render_presets_presets.remove(context.window_manager.render_presets_active_preset)
 
     @classmethod
     def scene_to_preset(cls, context, preset):
         # Store scene settings to active preset file
         if not preset.locked:
-            preset_data = cls.preset_data_from_scene(context=context)
+            preset_file_name = cls._preset_file_name_by_name(context=context, preset_name=preset.name)
+            saved_preset_data = cls._preset_data_from_file(
+                context=context,
+                preset_file_name=preset_file_name
+            )
+            preset_data = cls.preset_data_from_scene(
+                context=context,
+                sections=preset.sections
+            )
             preset_data['camera_name'] = preset.camera.name if preset.camera else ''
+            preset_data['render_animation'] = preset.render_animation
+            if saved_preset_data and saved_preset_data.get('parent'):
+                preset_data = cls._preset_data_delta(
+                    context=context,
+                    preset_data=preset_data,
+                    parent=saved_preset_data['parent']
+                )
             cls._preset_data_to_file(
                 context=context,
-                preset_file_name=preset.name + '.' + cls._preset_file_ext,
+                preset_file_name=preset_file_name,
                 preset_data=preset_data
             )
 
     @classmethod
-    def preset_to_scene(cls, context, preset):
+    def preset_to_scene(cls, context, preset, journal: dict = None):
         # Load scene settings from active preset
         cls.preset_data_to_scene(
             context=context,
-            preset_data=cls._preset_data_from_file(
+            preset_data=cls.preset_data(
                 context=context,
-                preset_file_name=preset.name + '.' + cls._preset_file_ext
-            )
+                preset_name=preset.name
+            ),
+            journal=journal
+        )
+
+    @classmethod
+    def preset_data(cls, context, preset_name):
+        # returns preset data by preset name
+        return cls._preset_data_resolved(
+            context=context,
+            preset_name=preset_name
+        )
+
+    @classmethod
+    def _preset_data_resolved(cls, context, preset_name, children=None):
+        # returns preset data with attributes inherited from the parent presets
+        if preset_name == cls.defaults_preset_name:
+            return cls._preset_data_defaults(context=context)
+        preset_data = cls._preset_data_from_file(
+            context=context,
+            preset_file_name=cls._preset_file_name_by_name(context=context, preset_name=preset_name)
         )
+        if preset_data and preset_data.get('parent'):
+            children = set() if children is None else children
+            children.add(preset_name)
+            if preset_data['parent'] in children:
+                print('ERR: presets inheritance loop ', preset_name, ' -> ', preset_data['parent'])
+            else:
+                parent_preset_data = cls._preset_data_resolved(
+                    context=context,
+                    preset_name=preset_data['parent'],
+                    children=children
+                )
+                if parent_preset_data:
+                    preset_data = dict(
+                        preset_data,
+                        attributes={**parent_preset_data['attributes'], **preset_data['attributes']}
+                    )
+                else:
+                    print('ERR: parent preset not found ', preset_data['parent'])
+        return preset_data
 
     @classmethod
-    def preset_data_from_scene(cls, context):
+    def _preset_data_delta(cls, context, preset_data, parent):
+        # leave in preset data only attributes different from the parent preset
+        parent_preset_data = cls._preset_data_resolved(
+            context=context,
+            preset_name=parent
+        )
+        if parent_preset_data:
+            parent_attributes = parent_preset_data['attributes']
+            preset_data['attributes'] = {
+                attribute: value for attribute, value in preset_data['attributes'].items()
+                if attribute not in parent_attributes or parent_attributes[attribute] != value
+            }
+            preset_data['parent'] = parent
+        return preset_data
+
+    @classmethod
+    def _flatten_child_presets(cls, context, preset_name):
+        # move attributes of the preset to its child presets and re-link them to the preset parent
+        preset_data = cls._preset_data_from_file(
+            context=context,
+            preset_file_name=cls._preset_file_name_by_name(context=context, preset_name=preset_name)
+        )
+        if preset_data:
+            for file_name in cls._child_presets_files(context=context, preset_name=preset_name):
+                child_preset_data = cls._preset_data_from_file(
+                    context=context,
+                    preset_file_name=file_name
+                )
+                if child_preset_data:
+                    cls._preset_data_to_file(
+                        context=context,
+                        preset_file_name=file_name,
+                        preset_data=dict(
+                            child_preset_data,
+                            parent=preset_data.get('parent', ''),
+                            attributes={**preset_data['attributes'], **child_preset_data['attributes']}
+                        )
+                    )
+
+    @classmethod
+    def _child_presets_files(cls, context, preset_name):
+        # returns files of the presets inherited from the preset
+        return [
+            file_name for file_name, index_entry in RenderPresetsIndex.entries(
+                presets_folder_path=cls._presets_folder_path(context=context),
+                files=cls._presets_files(context=context)
+            ) if index_entry and index_entry['parent'] == preset_name
+        ]
+
+    @classmethod
+    def _preset_data_defaults(cls, context):
+        # returns preset data with Blender default values for all preset attributes
+        if cls._defaults_preset_data is None:
+            preset_data = cls.preset_data_from_scene(context=context)
+            for attribute in list(preset_data['attributes']):
+                attribute_default = cls._attribute_default(
+                    context=context,
+                    attribute_text=attribute
+                )
+                if attribute_default is None:
+                    del preset_data['attributes'][attribute]
+                else:
+                    preset_data['attributes'][attribute] = attribute_default
+            cls._defaults_preset_data = preset_data
+        return cls._defaults_preset_data
+
+    @classmethod
+    def _attribute_default(cls, context, attribute_text):
+        # returns attribute default value from its RNA definition or None if there is no default value
+        accessor = RenderPresetsAccessor.by_path(path=attribute_text)
+        attribute_instance = accessor.owner(context=context)
+        if not hasattr(attribute_instance, 'bl_rna'):
+            return None
+        bl_property = attribute_instance.bl_rna.properties.get(accessor.identifier)
+        if bl_property is None or bl_property.type in ('POINTER', 'COLLECTION'):
+            return None
+        elif bl_property.type == 'ENUM':
+            if bl_property.is_enum_flag:
+                # set as separate type because json doesn't serialize "set" type
+                return BLSet.to_json(instance=bl_property.default_flag)
+            return bl_property.default
+        elif getattr(bl_property, 'array_length', 0) > 0:
+            return list(bl_property.default_array)
+        return bl_property.default
+
+    @classmethod
+    @RenderPresetsProfiler.profiled
+    def preset_data_from_scene(cls, context, sections=None):
         # returns preset data
+        #   sections - capture only attributes from these sections (all sections if None)
         preset_data = dict()
         # lock
         preset_data['locked'] = False
         # camera
         preset_data['camera_name'] = ''
+        # parent preset (only attributes different from the parent are saved)
+        preset_data['parent'] = ''
+        # render frames range from the preset attributes instead of a single frame
+        preset_data['render_animation'] = False
+        # captured and applied attributes sections
+        preset_data['sections'] = [section for section in cls.sections if sections is None or section in sections]
         # attributes
         preset_data['attributes'] = dict()
         # add here data to save to the preset
@@ -419,41 +747,43 @@ class RenderPresets:
             preset_data=preset_data
         )
         # viewport
-        # context.space_data
-        cls._add_attributes_to_preset_data(
-            context=context,
-            render_property=context.space_data,
-            render_property_txt='context.space_data',
-            excluded_attributes=(
-                'rna_type', 'camera', 'icon_from_show_object_viewport', 'local_view',
-                'lock_object', 'overlay', 'region_3d', 'region_quadviews', 'shading',
-                'show_locked_time', 'show_region_ui', 'stereo_3d_eye', 'type'
-            ),
-            preset_data=preset_data
-        )
-        # context.space_data.overlay
-        cls._add_attributes_to_preset_data(
-            context=context,
-            render_property=context.space_data.overlay,
-            render_property_txt='context.space_data.overlay',
-            excluded_attributes=(
-                'rna_type', 'grid_scale_unit'
-            ),
-            preset_data=preset_data
-        )
-        # context.space_data.shading
-        cls._add_attributes_to_preset_data(
-            context=context,
-            render_property=context.space_data.shading,
-            render_property_txt='context.space_data.shading',
-            excluded_attributes=(
-                'rna_type', 'cycles', 'selected_studio_light'
-            ),
-            preset_data=preset_data,
-            first_attributes=[
-                'type', 'background_type'
-            ]
-        )
+        #   no 3D viewport in background mode (or when called not from the 3D viewport)
+        if context.space_data and context.space_data.type == 'VIEW_3D':
+            # context.space_data
+            cls._add_attributes_to_preset_data(
+                context=context,
+                render_property=context.space_data,
+                render_property_txt='context.space_data',
+                excluded_attributes=(
+                    'rna_type', 'camera', 'icon_from_show_object_viewport', 'local_view',
+                    'lock_object', 'overlay', 'region_3d', 'region_quadviews', 'shading',
+                    'show_locked_time', 'show_region_ui', 'stereo_3d_eye', 'type'
+                ),
+                preset_data=preset_data
+            )
+            # context.space_data.overlay
+            cls._add_attributes_to_preset_data(
+                context=context,
+                render_property=context.space_data.overlay,
+                render_property_txt='context.space_data.overlay',
+                excluded_attributes=(
+                    'rna_type', 'grid_scale_unit'
+                ),
+                preset_data=preset_data
+            )
+            # context.space_data.shading
+            cls._add_attributes_to_preset_data(
+                context=context,
+                render_property=context.space_data.shading,
+                render_property_txt='context.space_data.shading',
+                excluded_attributes=(
+                    'rna_type', 'cycles', 'selected_studio_light'
+                ),
+                preset_data=preset_data,
+                first_attributes=[
+                    'type', 'background_type'
+                ]
+            )
         # optional
         if context.preferences.addons[__package__].preferences.use_active_view_layer:
             # active view_layer
@@ -497,161 +827,309 @@ class RenderPresets:
     def _add_attributes_to_preset_data(cls, context, render_property, render_property_txt,
                                        excluded_attributes, preset_data, first_attributes=None):
         # add render property attributes to preset data
-        first_attributes = [] if first_attributes is None else first_attributes
-        # some attributes need to be processed first because other attributes depends on them
-        attributes_to_process_first = [
-            attribute for attribute in first_attributes if
-            not attribute.startswith('__')
-            and not attribute.startswith('bl_')
-            and attribute not in excluded_attributes
-            and hasattr(render_property, attribute)
-            and not callable(getattr(render_property, attribute))
-        ]
-        # all other attributes
-        attributes_to_process_next = [
-            attribute for attribute in dir(render_property) if
-            not attribute.startswith('__')
-            and not attribute.startswith('bl_')
-            and attribute not in excluded_attributes
-            and attribute not in first_attributes
-            and hasattr(render_property, attribute)
-            and not callable(getattr(render_property, attribute))
-        ]
-        attributes = attributes_to_process_first + attributes_to_process_next
-        for attribute in attributes:
+        #   only if the render property is in the preset data sections
+        if cls._owner_section(owner_path=render_property_txt) not in preset_data['sections']:
+            return
+        for attribute, attribute_type in RenderPresetsSchema.attributes(
+                render_property=render_property,
+                excluded_attributes=excluded_attributes,
+                first_attributes=first_attributes
+        ):
             try:
-                if isinstance(getattr(render_property, attribute), CurveMapping):
-                    cls._add_attribute_to_preset_data(
-                        attribute=render_property_txt + '.' + attribute,
-                        context=context,
-                        preset_data=preset_data,
-                        attribute_type='CurveMapping'
-                    )
-                elif hasattr(render_property, 'is_property_readonly') \
-                        and render_property.is_property_readonly(attribute):
-                    print(
-                        render_property,
-                        attribute + ' (' + render_property_txt + '.' + attribute + ')',
-                        ' (', type(getattr(render_property, attribute)), ') ', ': ',
-                        getattr(render_property, attribute),
-                        'READ_ONLY'
-                    )
-                elif isinstance(getattr(render_property, attribute), bpy_prop_array):
-                    cls._add_attribute_to_preset_data(
-                        attribute=render_property_txt + '.' + attribute,
+                cls._add_attribute_to_preset_data(
+                    attribute=render_property_txt + '.' + attribute,
+                    context=context,
+                    preset_data=preset_data,
+                    attribute_type=attribute_type,
+                    attribute_instance=render_property
+                )
+            except Exception as exception:
+                print('ERR: ', exception)
+
+    @classmethod
+    @RenderPresetsProfiler.profiled
+    def preset_data_to_scene(cls, context, preset_data: dict, journal: dict = None, backup=True):
+        # store preset data to scene properties
+        #   original values of the overwritten attributes are recorded to the scene backup journal (backup=True)
+        #   and to the journal (if set)
+        with RenderPresetsTimings.span(stage='apply'):
+            journals = (cls._scene_journal_lazy(context=context), ) if backup else ()
+            if journal is not None:
+                journals += (journal, )
+            # camera
+            for current_journal in journals:
+                if current_journal['camera_name'] is None:
+                    current_journal['camera_name'] = context.scene.camera.name if context.scene.camera else ''
+            if preset_data['camera_name']\
+                    and preset_data['camera_name'] in context.scene.objects\
+                    and context.scene.objects[preset_data['camera_name']].type == 'CAMERA':
+                context.scene.camera = cls._object_by_name(
+                    context=context,
+                    object_name=preset_data['camera_name']
+                )
+            else:
+                cls._restore_camera(context=context)
+            # attributes
+            # write only attributes with values different from the current scene values
+            #   each write calls update callbacks and depsgraph tagging
+            only_changed = context.preferences.addons[__package__].preferences.apply_changed_only
+            cls.last_applied_count = 0
+            # only attributes from the preset sections
+            #   (preset sections can be narrowed after saving or inherited attributes can be from other sections)
+            attributes = preset_data['attributes']
+            sections = preset_data.get('sections')
+            if sections is not None and len(sections) < len(cls.sections):
+                attributes = {
+                    attribute: value for attribute, value in attributes.items()
+                    if cls._owner_section(owner_path=RenderPresetsAccessor.by_path(path=attribute).owner_path) in sections
+                }
+            # original values are read before any writing - writing changes other attributes by update side effects
+            #   timed as the backup stage (nested spans time is excluded from the apply stage)
+            if journals:
+                with RenderPresetsTimings.span(stage='backup'):
+                    cls._journal_attributes(
                         context=context,
-                        preset_data=preset_data,
-                        attribute_type='bpy_prop_array'
+                        attributes=attributes,
+                        journals=journals
                     )
-                elif isinstance(getattr(render_property, attribute), (Vector, Color)):
-                    cls._add_attribute_to_preset_data(
-                        attribute=render_property_txt + '.' + attribute,
+            # preordered attributes (mast be loaded first because some other attributes depends on them)
+            for attribute in cls._preordered_attributes:
+                if attribute in attributes:
+                    cls.last_applied_count += cls._set_attribute_from_preset_data(
                         context=context,
-                        preset_data=preset_data,
-                        attribute_type='Vector'
+                        attribute_text=attribute,
+                        attribute=attributes[attribute],
+                        only_changed=only_changed
                     )
-                elif isinstance(getattr(render_property, attribute), set):
-                    # set as separate type because json doesn't serialize "set" type
-                    # print('set: ', attribute, ' (', type(getattr(render_property, attribute)), ') ',
-                    #       ': ', getattr(render_property, attribute), 'SET')
-                    cls._add_attribute_to_preset_data(
-                        attribute=render_property_txt + '.' + attribute,
+            # all other attributes
+            for attribute in attributes:
+                if attribute not in cls._preordered_attributes:
+                    cls.last_applied_count += cls._set_attribute_from_preset_data(
                         context=context,
-                        preset_data=preset_data,
-                        attribute_type='BLSet'
-                    )
-                elif not isinstance(getattr(render_property, attribute), (int, float, bool, str, set)):
-                    print(
-                        attribute,
-                        ' (', type(getattr(render_property, attribute)), ') ', ': ',
-                        getattr(render_property, attribute),
-                        'COMPLEX TYPE'
+                        attribute_text=attribute,
+                        attribute=attributes[attribute],
+                        only_changed=only_changed
                     )
-                else:
-                    cls._add_attribute_to_preset_data(
-                        attribute=render_property_txt + '.' + attribute,
-                        context=context,
-                        preset_data=preset_data
+            return preset_data
+
+    @staticmethod
+    def new_journal():
+        # journal of the original values of the overwritten scene attributes
+        #   camera_name - None while the camera is not recorded, attributes - in the order of recording
+        return {'camera_name': None, 'attributes': {}}
+
+    @classmethod
+    def journal_to_scene(cls, context, journal: dict):
+        # restore scene attributes recorded in the journal
+        #   attributes are restored in the reverse order (preordered attributes are still restored first
+        #   because other attributes values depend on them)
+        cls.preset_data_to_scene(
+            context=context,
+            preset_data={
+                'camera_name': journal['camera_name'] or '',
+                'attributes': dict(reversed(list(journal['attributes'].items())))
+            },
+            backup=False
+        )
+
+    @classmethod
+    def journal_current_values(cls, context, journal: dict):
+        # journal with the current scene values of the attributes recorded in the journal
+        current_journal = cls.new_journal()
+        current_journal['camera_name'] = context.scene.camera.name if context.scene.camera else ''
+        for attribute_text, attribute in journal['attributes'].items():
+            accessor = RenderPresetsAccessor.by_path(path=attribute_text)
+            attribute_instance = accessor.owner(context=context)
+            if attribute_instance and hasattr(attribute_instance, accessor.identifier):
+                current_journal['attributes'][attribute_text] = cls._attribute_value(
+                    attribute_instance=attribute_instance,
+                    attribute_name=accessor.identifier,
+                    attribute=attribute
+                )
+        return current_journal
+
+    @classmethod
+    def _journal_attributes(cls, context, attributes: dict, journals: tuple):
+        # record original values of the attributes changed by the preset to the journals (if not recorded yet)
+        #   if some preordered attribute is changed - all attributes are recorded, because its writing
+        #   changes other attributes (image_settings.file_format - color_depth, ffmpeg codec, ...)
+        current_values = {}
+        for attribute_text, attribute in attributes.items():
+            accessor = RenderPresetsAccessor.by_path(path=attribute_text)
+            attribute_instance = accessor.owner(context=context)
+            try:
+                if attribute_instance and hasattr(attribute_instance, accessor.identifier):
+                    current_values[attribute_text] = cls._attribute_value(
+                        attribute_instance=attribute_instance,
+                        attribute_name=accessor.identifier,
+                        attribute=attribute
                     )
             except Exception as exception:
                 print('ERR: ', exception)
+        record_all = any(
+            attribute in current_values and current_values[attribute] != attributes[attribute]
+            for attribute in cls._preordered_attributes
+        )
+        for journal in journals:
+            for attribute_text, current_value in current_values.items():
+                if attribute_text not in journal['attributes'] \
+                        and (record_all or current_value != attributes[attribute_text]):
+                    journal['attributes'][attribute_text] = current_value
 
     @classmethod
-    def preset_data_to_scene(cls, context, preset_data: dict):
-        # store preset data to scene properties
-        cls._backup_scene(context=context)
-        # camera
-        if preset_data['camera_name']\
-                and preset_data['camera_name'] in context.scene.objects\
-                and context.scene.objects[preset_data['camera_name']].type == 'CAMERA':
-            context.scene.camera = cls._object_by_name(
-                context=context,
-                object_name=preset_data['camera_name']
-            )
-        else:
-            cls._restore_camera(context=context)
-        # attributes
-        # preordered attributes (mast be loaded first because some other attributes depends on them)
-        # globally first - this attributes influence on attributes from other data sections
-        # (image_settings.file_format - ffmpeg section)
-        preordered_attributes = [
-            'context.scene.render.image_settings.file_format'
-        ]
-        for attribute in preordered_attributes:
-            if attribute in preset_data['attributes']:
-                cls._set_attribute_from_preset_data(
-                    context=context,
-                    attribute_text=attribute,
-                    attribute=preset_data['attributes'][attribute]
-                )
-        # all other attributes
-        for attribute in preset_data['attributes']:
-            if attribute not in preordered_attributes:
-                cls._set_attribute_from_preset_data(
-                    context=context,
-                    attribute_text=attribute,
-                    attribute=preset_data['attributes'][attribute]
-                )
-        return preset_data
+    def _owner_section(cls, owner_path):
+        # attributes section by the attributes owner path, None - owner is not in any section
+        section = cls._owners_sections.get(owner_path)
+        if section is None and owner_path not in cls._owners_sections:
+            parent_path = owner_path
+            while parent_path and parent_path not in cls._sections_owners:
+                parent_path = parent_path.rpartition('.')[0]
+            section = cls._sections_owners.get(parent_path)
+            cls._owners_sections[owner_path] = section
+        return section
+
+    @classmethod
+    def _scene_journal_lazy(cls, context):
+        # scene backup journal - grows with each applied preset
+        if cls._scene_journal is None:
+            cls._scene_journal = cls.new_journal()
+            cls._backup_camera(context=context)
+        return cls._scene_journal
 
     @classmethod
     def _preset_data_from_file(cls, context, preset_file_name):
         # return preset data from file (saved preset)
+        #   parsed preset data is cached while preset file is not changed
         preset_data = None
         file_path = os.path.join(cls._presets_folder_path(context=context), preset_file_name)
-        if os.path.isfile(file_path):
-            with open(file=file_path, mode='r', encoding='utf8') as preset_file:
-                preset_data = json.load(preset_file)
+        with RenderPresetsTimings.span(stage='read'):
+            if os.path.isfile(file_path):
+                file_stat = os.stat(file_path)
+                preset_data = RenderPresetsCache.get(file_path=file_path, file_stat=file_stat)
+                if preset_data is None:
+                    with open(file=file_path, mode='rb') as preset_file:
+                        preset_data, data_size = RenderPresetsFormat.loads_sized(content=preset_file.read())
+                    RenderPresetsCache.put(
+                        file_path=file_path,
+                        file_stat=file_stat,
+                        preset_data=preset_data,
+                        data_size=data_size,
+                        max_size=cls._cache_max_size(context=context)
+                    )
         return preset_data
 
     @classmethod
+    @RenderPresetsProfiler.profiled
     def _preset_data_to_file(cls, context, preset_file_name, preset_data):
         # save preset data to preset file
+        #   file format is defined by the file extension
         file_path = os.path.join(cls._presets_folder_path(context=context), preset_file_name)
-        with open(file=file_path, mode='w', encoding='utf8') as preset_file:
-            json.dump(preset_data, preset_file, indent=4, ensure_ascii=False, sort_keys=False)
+        content, data_size = RenderPresetsFormat.dumps_sized(
+            preset_data=preset_data,
+            file_format='COMPACT' if preset_file_name.endswith('.' + RenderPresetsFormat.compact_ext) else 'JSON'
+        )
+        RenderPresetsFileSystem.write_atomic(
+            file_path=file_path,
+            content=content
+        )
+        RenderPresetsCache.put(
+            file_path=file_path,
+            file_stat=os.stat(file_path),
+            preset_data=preset_data,
+            data_size=data_size,
+            max_size=cls._cache_max_size(context=context)
+        )
 
     @classmethod
-    def _backup_scene(cls, context):
-        # backup current preset data
-        if not cls._scene_backup:
-            cls._scene_backup = cls.preset_data_from_scene(context=context)
-            cls._backup_camera(context=context)
+    def _preset_metadata_to_file(cls, context, preset_file_name, metadata: dict):
+        # change preset metadata (locked, camera_name, ...) in preset file
+        #   saved attributes are copied as is, only the metadata header is re-serialized
+        preset_data = cls._preset_data_from_file(
+            context=context,
+            preset_file_name=preset_file_name
+        )
+        if preset_data:
+            preset_data = dict(preset_data, **metadata)
+            file_path = os.path.join(cls._presets_folder_path(context=context), preset_file_name)
+            with open(file=file_path, mode='rb') as preset_file:
+                content = RenderPresetsFormat.replace_metadata(
+                    content=preset_file.read(),
+                    preset_data=preset_data
+                )
+            if content is not None:
+                # attributes are not changed - decoded size from the cache (preset data was just read),
+                #   the metadata size change is negligible
+                data_size = RenderPresetsCache.data_size(file_path=file_path)
+                RenderPresetsFileSystem.write_atomic(
+                    file_path=file_path,
+                    content=content
+                )
+                RenderPresetsCache.put(
+                    file_path=file_path,
+                    file_stat=os.stat(file_path),
+                    preset_data=preset_data,
+                    data_size=data_size if data_size is not None else len(content),
+                    max_size=cls._cache_max_size(context=context)
+                )
+            else:
+                # preset file saved not by the add-on - rewrite it fully
+                cls._preset_data_to_file(
+                    context=context,
+                    preset_file_name=preset_file_name,
+                    preset_data=preset_data
+                )
+
+    @classmethod
+    def convert_presets(cls, context):
+        # convert all preset files to the format selected in preferences
+        file_ext = RenderPresetsFormat.file_ext(
+            file_format=context.preferences.addons[__package__].preferences.preset_file_format
+        )
+        presets_folder_path = cls._presets_folder_path(context=context)
+        converted = 0
+        for file in cls._presets_files(context=context):
+            preset_name, preset_file_ext = os.path.splitext(file)
+            if preset_file_ext != '.' + file_ext:
+                preset_data = cls._preset_data_from_file(
+                    context=context,
+                    preset_file_name=file
+                )
+                if preset_data:
+                    cls._preset_data_to_file(
+                        context=context,
+                        preset_file_name=preset_name + '.' + file_ext,
+                        preset_data=preset_data
+                    )
+                    os.remove(os.path.join(presets_folder_path, file))
+                    RenderPresetsCache.remove(file_path=os.path.join(presets_folder_path, file))
+                    converted += 1
+        return converted
+
+    @staticmethod
+    def _cache_max_size(context):
+        # max size of the parsed presets cache in bytes
+        return context.preferences.addons[__package__].preferences.preset_cache_size * 1024 * 1024
 
     @classmethod
     def restore_scene(cls, context):
-        # restore scene from backup
-        if cls._scene_backup:
-            cls.preset_data_to_scene(
+        # restore scene from backup journal
+        if cls._scene_journal:
+            cls.journal_to_scene(
                 context=context,
-                preset_data=cls._scene_backup
+                journal=cls._scene_journal
             )
             cls._restore_camera(context=context)
 
+    @classmethod
+    def clear_scene_backup(cls):
+        # forget scene backup (recorded for other scene)
+        cls._scene_journal = None
+        cls._camera_backup = None
+
     @classmethod
     def _backup_camera(cls, context):
         # backup active scene camera
-        cls._camera_backup = context.scene.camera.name
+        cls._camera_backup = context.scene.camera.name if context.scene.camera else None
 
     @classmethod
     def _restore_camera(cls, context):
@@ -664,51 +1142,57 @@ class RenderPresets:
     @classmethod
     def clear_presets_list(cls, context):
         # remove all presets from the list
-        while context.window_manager.render_presets_presets:
-            context.window_manager.render_presets_presets.remove(0)
+        context.window_manager.render_presets_presets.clear()
+        RenderPresetsRegistry.clear()
 
     @classmethod
-    def _add_attribute_to_preset_data(cls, context, preset_data: dict, attribute: str, attribute_type: str = 'prop'):
+    def _add_attribute_to_preset_data(cls, context, preset_data: dict, attribute: str, attribute_type: str = 'prop',
+                                      attribute_instance=None):
         # add attribute data to preset dict
-        # context needed to eval
-        attribute_instance, attribute_name = attribute.rsplit('.', maxsplit=1)
-        if hasattr(eval(attribute_instance), attribute_name):
+        accessor = RenderPresetsAccessor.by_path(path=attribute)
+        if attribute_instance is None:
+            attribute_instance = accessor.owner(context=context)
+        if hasattr(attribute_instance, accessor.identifier):
+            attribute_value = getattr(attribute_instance, accessor.identifier)
             if attribute_type == 'bpy_prop_array':
-                attribute_value = []
-                for value in getattr(eval(attribute_instance), attribute_name):
-                    attribute_value.append(value)
-            elif attribute_type == 'Vector':
-                attribute_value = tuple(getattr(eval(attribute_instance), attribute_name))
+                attribute_value = list(attribute_value)
             elif attribute_type == 'CurveMapping':
-                attribute_value = BLCurveMapping.to_json(instance=getattr(eval(attribute_instance), attribute_name))
+                attribute_value = BLCurveMapping.to_json(instance=attribute_value)
             elif attribute_type == 'BLSet':
                 # set as separate type because json doesn't serialize "set" type
-                attribute_value = BLSet.to_json(
-                    instance=getattr(eval(attribute_instance), attribute_name))
-            else:
-                attribute_value = getattr(eval(attribute_instance), attribute_name)
+                attribute_value = BLSet.to_json(instance=attribute_value)
             preset_data['attributes'][attribute] = attribute_value
 
     @classmethod
-    def _set_attribute_from_preset_data(cls, context, attribute_text, attribute):
+    def _set_attribute_from_preset_data(cls, context, attribute_text, attribute, only_changed=False):
         # load attribute data from preset dict
-        # context needed to eval
-        attribute_instance, attribute_name = attribute_text.rsplit('.', maxsplit=1)
+        # returns True if attribute was written to the scene
+        accessor = RenderPresetsAccessor.by_path(path=attribute_text)
+        attribute_instance = accessor.owner(context=context)
         try:
-            attribute_instance = eval(attribute_instance)
-            if attribute_instance and hasattr(attribute_instance, attribute_name):
+            if attribute_instance and hasattr(attribute_instance, accessor.identifier):
+                if only_changed and cls._attribute_equal(
+                        attribute_instance=attribute_instance,
+                        attribute_name=accessor.identifier,
+                        attribute=attribute
+                ):
+                    return False
                 if isinstance(attribute, dict) and 'class' in attribute:
                     # complex attribute
                     if attribute['class'] == 'CurveMapping':
                         BLCurveMapping.from_json(
-                            instance=eval(attribute_text),
+                            instance=getattr(attribute_instance, accessor.identifier),
                             json=attribute
                         )
                     elif attribute['class'] == 'set':
                         # set as separate type because json doesn't serialize "set" type
-                        BLSet.from_json(
-                            instance=eval(attribute_text),
-                            json=attribute
+                        setattr(
+                            attribute_instance,
+                            accessor.identifier,
+                            BLSet.from_json(
+                                instance=getattr(attribute_instance, accessor.identifier),
+                                json=attribute
+                            )
                         )
                     else:
                         print('ERR: unknown complex attribute')
@@ -732,56 +1216,104 @@ class RenderPresets:
                     # else:
                     #     setattr(attribute_instance, attribute_name, attribute)
 
-                    setattr(attribute_instance, attribute_name, attribute)
+                    setattr(attribute_instance, accessor.identifier, attribute)
+                return True
         except Exception as exception:
             print('ERR: ', exception)
             print('\t ', 'attribute = ', attribute, ', attribute_text = ',
                   attribute_text, ', attribute_instance = ', attribute_instance)
+        return False
+
+    @staticmethod
+    def _attribute_value(attribute_instance, attribute_name, attribute):
+        # current attribute value in the same form as the value from preset data
+        current_value = getattr(attribute_instance, attribute_name)
+        if isinstance(attribute, dict) and 'class' in attribute:
+            # complex attribute
+            if attribute['class'] == 'CurveMapping':
+                return BLCurveMapping.to_json(instance=current_value)
+            elif attribute['class'] == 'set':
+                return BLSet.to_json(instance=current_value)
+        elif isinstance(attribute, list):
+            return list(current_value)
+        return current_value
+
+    @staticmethod
+    def _attribute_equal(attribute_instance, attribute_name, attribute):
+        # compare current attribute value with the value from preset data
+        current_value = getattr(attribute_instance, attribute_name)
+        if isinstance(attribute, dict) and 'class' in attribute:
+            # complex attribute
+            if attribute['class'] == 'CurveMapping':
+                return BLCurveMapping.to_json(instance=current_value) == attribute
+            elif attribute['class'] == 'set':
+                return current_value == set(attribute['instance'])
+            return False
+        elif isinstance(attribute, list):
+            return list(current_value) == attribute
+        return current_value == attribute
 
     @classmethod
     def change_preset_name(cls, context, preset_item):
         # changes preset name
+        old_file_name = cls._preset_file_name_by_name(context=context, preset_name=preset_item.name_old)
         old_file_path = os.path.join(
             cls._presets_folder_path(context=context),
-            preset_item.name_old + '.' + cls._preset_file_ext
+            old_file_name
         )
         if os.path.isfile(old_file_path):
             new_file_path = os.path.join(
                 cls._presets_folder_path(context=context),
-                preset_item.name + '.' + cls._preset_file_ext
+                preset_item.name + os.path.splitext(old_file_name)[1]
             )
             os.rename(old_file_path, new_file_path)
+            RenderPresetsCache.remove(file_path=old_file_path)
+            # child presets
+            for file_name in cls._child_presets_files(context=context, preset_name=preset_item.name_old):
+                cls._preset_metadata_to_file(
+                    context=context,
+                    preset_file_name=file_name,
+                    metadata={'parent': preset_item.name}
+                )
 
     @classmethod
     def change_preset_camera(cls, context, preset_item):
         # changes preset camera
         if not preset_item.locked:
-            preset_data = cls._preset_data_from_file(
+            cls._preset_metadata_to_file(
                 context=context,
-                preset_file_name=preset_item.name + '.' + cls._preset_file_ext
+                preset_file_name=cls._preset_file_name_by_name(context=context, preset_name=preset_item.name),
+                metadata={'camera_name': preset_item.camera.name if preset_item.camera else ''}
+            )
+
+    @classmethod
+    def change_preset_render_animation(cls, context, preset_item):
+        # changes preset render mode - single frame or frames range
+        if not preset_item.locked:
+            cls._preset_metadata_to_file(
+                context=context,
+                preset_file_name=cls._preset_file_name_by_name(context=context, preset_name=preset_item.name),
+                metadata={'render_animation': preset_item.render_animation}
+            )
+
+    @classmethod
+    def change_preset_sections(cls, context, preset_item):
+        # changes preset captured and applied attributes sections
+        if not preset_item.locked:
+            cls._preset_metadata_to_file(
+                context=context,
+                preset_file_name=cls._preset_file_name_by_name(context=context, preset_name=preset_item.name),
+                metadata={'sections': [section for section in cls.sections if section in preset_item.sections]}
             )
-            if preset_data:
-                preset_data['camera_name'] = preset_item.camera.name if preset_item.camera else ''
-                cls._preset_data_to_file(
-                    context=context,
-                    preset_file_name=preset_item.name + '.' + cls._preset_file_ext,
-                    preset_data=preset_data
-                )
 
     @classmethod
     def change_preset_lock(cls, context, preset, lock_status):
         # changes preset lock status in its file
-        preset_data = cls._preset_data_from_file(
+        cls._preset_metadata_to_file(
             context=context,
-            preset_file_name=preset.name + '.' + cls._preset_file_ext
+            preset_file_name=cls._preset_file_name_by_name(context=context, preset_name=preset.name),
+            metadata={'locked': lock_status}
         )
-        if preset_data:
-            preset_data['locked'] = lock_status
-            cls._preset_data_to_file(
-                context=context,
-                preset_file_name=preset.name + '.' + cls._preset_file_ext,
-                preset_data=preset_data
-            )
 
     @classmethod
     def _object_by_name(cls, context, object_name):
@@ -792,22 +1324,74 @@ class RenderPresets:
         return obj
 
     @classmethod
-    def _get_new_file_name(cls, context):
+    def _get_new_file_name(cls, context, used_names: set = None):
         # Returns unic file name for preset
-        uid_postfix = 1
-        unic_file_name = cls._preset_file_name + '.' + str(uid_postfix).zfill(3) + '.' + cls._preset_file_ext
-        while unic_file_name in cls._presets_files(context=context):
+        #   names are checked in one presets folder snapshot (used_names - preset names without extensions),
+        #   search starts from the last allocated postfix so allocating names one after another is O(1)
+        file_ext = RenderPresetsFormat.file_ext(
+            file_format=context.preferences.addons[__package__].preferences.preset_file_format
+        )
+        if used_names is None:
+            used_names = {os.path.splitext(file)[0] for file in cls._presets_files(context=context)}
+        presets_folder_path = cls._presets_folder_path(context=context)
+        if presets_folder_path != cls._new_file_name_folder_path:
+            cls._new_file_name_folder_path = presets_folder_path
+            cls._new_file_name_postfix = 0
+        uid_postfix = cls._new_file_name_postfix + 1
+        unic_file_name = cls._preset_file_name + '.' + str(uid_postfix).zfill(3)
+        while unic_file_name in used_names:
             uid_postfix += 1
-            unic_file_name = cls._preset_file_name + '.' + str(uid_postfix).zfill(3) + '.' + cls._preset_file_ext
-        return unic_file_name
+            unic_file_name = cls._preset_file_name + '.' + str(uid_postfix).zfill(3)
+        cls._new_file_name_postfix = uid_postfix
+        return unic_file_name + '.' + file_ext
+
+    @classmethod
+    def _reserve_new_file_name(cls, context):
+        # Returns unic file name for preset and creates an empty file with this name
+        #   file is created exclusively, so several Blender sessions adding presets to the same shared folder
+        #   at once get different names
+        used_names = {os.path.splitext(file)[0] for file in cls._presets_files(context=context)}
+        while True:
+            preset_file_name = cls._get_new_file_name(context=context, used_names=used_names)
+            try:
+                os.close(os.open(
+                    os.path.join(cls._presets_folder_path(context=context), preset_file_name),
+                    os.O_CREAT | os.O_EXCL | os.O_WRONLY,
+                    0o666   # regular file permissions (with umask), default 0o777 makes it executable
+                ))
+                return preset_file_name
+            except FileExistsError:
+                # created by other session after the snapshot
+                used_names.add(os.path.splitext(preset_file_name)[0])
+
+    @classmethod
+    def _preset_file_name_by_name(cls, context, preset_name):
+        # Returns preset file name by preset name (preset can be saved in any supported format)
+        presets_folder_path = cls._presets_folder_path(context=context)
+        for file_ext in RenderPresetsFormat.files_ext:
+            if os.path.isfile(os.path.join(presets_folder_path, preset_name + '.' + file_ext)):
+                return preset_name + '.' + file_ext
+        return preset_name + '.' + RenderPresetsFormat.file_ext(
+            file_format=context.preferences.addons[__package__].preferences.preset_file_format
+        )
 
     @classmethod
     def _presets_files(cls, context):
-        # generator to get preset files in presets folder
-        for file in sorted(os.listdir(cls._presets_folder_path(context=context))):
-            if os.path.isfile(os.path.join(cls._presets_folder_path(context=context), file)) \
-                    and file.endswith('.' + cls._preset_file_ext):
-                yield file
+        # returns sorted list of preset files in presets folder
+        return RenderPresetsFileSystem.files(
+            path=cls._presets_folder_path(context=context),
+            files_ext=cls._presets_files_ext()
+        )
+
+    @staticmethod
+    def _presets_files_ext():
+        # extensions of preset files
+        return tuple('.' + file_ext for file_ext in RenderPresetsFormat.files_ext)
+
+    @classmethod
+    def presets_folder_path(cls, context):
+        # Return full path to presets folder
+        return cls._presets_folder_path(context=context)
 
     @classmethod
     def _presets_folder_path(cls, context):
@@ -0,0 +1,49 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Accessors for the attribute paths stored in presets
+#   path ('context.scene.render.bake.use_clear') is parsed only once into
+#   the owner getter (context -> context.scene.render.bake) and the property identifier ('use_clear')
+
+from operator import attrgetter
+
+
+class RenderPresetsAccessor:
+
+    __slots__ = ('path', 'owner_path', 'identifier', '_owner_getter')
+
+    _accessors = {}
+
+    def __init__(self, path: str):
+        self.path = path
+        self.owner_path, self.identifier = path.rsplit('.', maxsplit=1)
+        # all paths start from 'context'
+        owner_attributes = self.owner_path.split('.', maxsplit=1)
+        self._owner_getter = attrgetter(owner_attributes[1]) if len(owner_attributes) > 1 else None
+
+    @classmethod
+    def by_path(cls, path: str):
+        # returns cached accessor for the attribute path
+        accessor = cls._accessors.get(path)
+        if accessor is None:
+            accessor = cls(path=path)
+            cls._accessors[path] = accessor
+        return accessor
+
+    @classmethod
+    def clear(cls):
+        # clear accessors cache
+        cls._accessors.clear()
+
+    def owner(self, context):
+        # returns attribute owner or None if it is not available in this context
+        #   (ex: context.space_data in background mode or context.scene.world if scene has no world)
+        if self._owner_getter is None:
+            return context
+        try:
+            return self._owner_getter(context)
+        except AttributeError:
+            return None
@@ -6,47 +6,195 @@
 
 import functools
 import os
+import time
 import bpy
 from bpy.app.handlers import render_complete, render_cancel
 from .render_presets import RenderPresets
 from .render_presets_file_system import RenderPresetsFileSystem
+from .render_presets_image_writer import RenderPresetsImageWriter
+from .render_presets_manifest import BatchRenderManifest
+from .render_presets_timings import RenderPresetsTimings
 
 
 class BatchRender:
 
-    _presets = None
+    _jobs = None            # (preset, frame) to render, from the end
+    _jobs_count = 0
     _current_preset = None
+    _current_frame = None
+    _preset_changed = False
     _context = None
-    _backup = None
+    _backup = None          # journal of the scene attributes overwritten by the batch render
     _backup_camera = None
+    _backup_frame = None
     _render_in_progress = False
+    _render_retry_interval = 0.05
+    _render_finish_time = None
+    _render_start_time = None
+    _idle_times = []
+    _render_times = []  # (preset name, render time, render after state change)
+    _state_changes = {}
+    _state_changes_before = 0
+    _state_changes_after = 0
+    _manifest_states = {}
+
+    # attributes which changing is expensive for the render (engine switching, kernels loading,
+    # shaders recompiling) - presets are ordered to group them and minimize such changes
+    # in the order of priority
+    _state_attributes = (
+        'context.scene.render.engine',
+        'context.scene.cycles.device',
+        'context.scene.cycles.feature_set',
+        'context.scene.cycles.shading_system',
+        'context.view_layer.cycles.use_denoising',
+        'context.scene.cycles.use_denoising',
+        'context.scene.cycles.denoiser',
+        'context.scene.eevee.use_gtao',
+        'context.scene.eevee.use_ssr',
+        'context.scene.eevee.use_ssr_refraction',
+        'context.scene.eevee.use_soft_shadows',
+        'context.scene.eevee.use_shadows',
+        'context.scene.eevee.use_raytracing',
+        'context.scene.render.film_transparent',
+        'context.scene.view_settings.view_transform',
+        'context.scene.display.shading.light'
+    )
 
     @classmethod
     def batch_render_with_presets(cls, context, presets: list):
         # start batch render with presets
+        #   presets with "render_animation" are rendered for each frame of their frames range
         if presets:
-            cls._presets = presets
-            cls._context = context
-            cls._backup = RenderPresets.preset_data_from_scene(context=context)
-            cls._backup_camera = context.scene.camera
-            cls._render_nex_preset(context=context)
+            if context.preferences.addons[__package__].preferences.batch_render_reorder:
+                presets = cls._ordered_presets(context=context, presets=presets)
+            else:
+                # checked presets are rendered from the end of the list
+                presets = list(reversed(presets))
+            jobs = cls.jobs(context=context, presets=presets)
+            cls._manifest_states = BatchRenderManifest.preset_states(context=context, presets=presets)
+            if context.preferences.addons[__package__].preferences.batch_render_skip_rendered:
+                jobs = BatchRenderManifest.not_rendered_jobs(
+                    jobs=jobs,
+                    states=cls._manifest_states,
+                    output_dir=cls._output_dir(context=context)
+                )
+            if jobs:
+                # jobs are rendered from the end of the list
+                cls._jobs = list(reversed(jobs))
+                cls._jobs_count = len(jobs)
+                cls._render_finish_time = None
+                cls._idle_times = []
+                cls._render_times = []
+                cls._context = context
+                RenderPresetsTimings.start()
+                # filled with the original values when presets are applied (backup stage)
+                cls._backup = RenderPresets.new_journal()
+                cls._backup_camera = context.scene.camera
+                cls._backup_frame = context.scene.frame_current
+                context.window_manager.progress_begin(0, cls._jobs_count)
+                cls._render_nex_preset(context=context)
+
+    @classmethod
+    def jobs(cls, context, presets: list):
+        # render jobs (preset, frame) - frame is None for the single frame presets
+        return [
+            (preset, frame)
+            for preset in presets
+            for frame in cls.preset_frames(context=context, preset_name=preset.name)
+        ]
+
+    @classmethod
+    def preset_frames(cls, context, preset_name):
+        # frames to render with preset
+        #   the frames range is taken from the preset attributes, from the current scene if preset doesn't have them
+        preset_data = RenderPresets.preset_data(
+            context=context,
+            preset_name=preset_name
+        )
+        if not preset_data or not preset_data.get('render_animation', False):
+            return [None]
+        attributes = preset_data['attributes']
+        frame_start = attributes.get('context.scene.frame_start', context.scene.frame_start)
+        frame_end = attributes.get('context.scene.frame_end', context.scene.frame_end)
+        frame_step = attributes.get('context.scene.frame_step', context.scene.frame_step)
+        return list(range(frame_start, frame_end + 1, max(1, frame_step)))
+
+    @staticmethod
+    def output_file_name(preset_name, frame, file_extension):
+        # rendered image file name - preset name with the frame number for animation presets
+        return preset_name + ('' if frame is None else '_' + str(frame).zfill(4)) + file_extension
+
+    @classmethod
+    def _ordered_presets(cls, context, presets: list):
+        # order presets to minimize expensive render state changes between them
+        #   presets are sorted by the state attributes values, so presets with the same render engine, device, etc.
+        #   go one after another
+        states = {
+            preset.name: cls._preset_state(context=context, preset=preset)
+            for preset in presets
+        }
+        ordered_presets = sorted(presets, key=lambda preset: states[preset.name])
+        # checked presets were rendered from the end of the list
+        cls._state_changes_before = cls._state_changes_count(
+            states=[states[preset.name] for preset in reversed(presets)]
+        )
+        cls._state_changes_after = cls._state_changes_count(states=[states[preset.name] for preset in ordered_presets])
+        # preset is rendered after the state change
+        cls._state_changes = {
+            preset.name: preset_id > 0 and states[preset.name] != states[ordered_presets[preset_id - 1].name]
+            for preset_id, preset in enumerate(ordered_presets)
+        }
+        print('B-Presets batch render order: ' + ', '.join(preset.name for preset in ordered_presets))
+        print(
+            'B-Presets batch render state changes: ' + str(cls._state_changes_before)
+            + ' -> ' + str(cls._state_changes_after)
+        )
+        return ordered_presets
+
+    @classmethod
+    def _preset_state(cls, context, preset):
+        # values of the state attributes in preset
+        preset_data = RenderPresets.preset_data(
+            context=context,
+            preset_name=preset.name
+        )
+        attributes = preset_data['attributes'] if preset_data else {}
+        return tuple(str(attributes.get(attribute, '')) for attribute in cls._state_attributes)
+
+    @staticmethod
+    def _state_changes_count(states: list):
+        # number of state changes in the states sequence
+        return sum(1 for state_id in range(1, len(states)) if states[state_id] != states[state_id - 1])
 
     @classmethod
     def _render_nex_preset(cls, context):
-        # render with next preset else clear
-        if cls._presets:
-            cls._current_preset = cls._presets.pop()
-            context.scene.camera = cls._backup_camera
-            RenderPresets.preset_to_scene(
-                context=cls._context,
-                preset=cls._current_preset
-            )
+        # render with next preset (frame) else clear
+        if cls._jobs:
+            preset, cls._current_frame = cls._jobs.pop()
+            # frames of the same preset go one after another - apply preset only once
+            cls._preset_changed = cls._current_preset is None or cls._current_preset.name != preset.name
+            cls._current_preset = preset
+            RenderPresetsTimings.preset_name = preset.name
+            if cls._preset_changed:
+                context.scene.camera = cls._backup_camera
+                if cls._current_frame is None:
+                    # still preset - from the original frame, not from the last frame of the previous animation preset
+                    #   (frame_current from the preset, if it is saved, is applied over it)
+                    context.scene.frame_set(cls._backup_frame)
+                RenderPresets.preset_to_scene(
+                    context=cls._context,
+                    preset=cls._current_preset,
+                    journal=cls._backup
+                )
+            if cls._current_frame is not None:
+                context.scene.frame_set(cls._current_frame)
             if cls._on_render_finish not in render_complete:
                 render_complete.append(cls._on_render_finish)
             if cls._on_render_cancel not in render_cancel:
                 render_cancel.append(cls._on_render_cancel)
-            # render with first preset
-            bpy.app.timers.register(functools.partial(cls._render), first_interval=1.0)
+            # render with next preset as soon as possible
+            #   render can't be started from the render_complete handler so it is started with the timer
+            bpy.app.timers.register(functools.partial(cls._render), first_interval=0.0)
         else:
             cls.clear()
 
@@ -54,6 +202,9 @@ class BatchRender:
     def _render(cls):
         # execute render
         rez = {'CANCELLED'}
+        if cls._current_preset is None:
+            # batch render was cancelled or finished
+            return None
         # for current_area in cls._context.window_manager.windows[0].screen.areas:
         #     if current_area.type == 'VIEW_3D':
         #         override_area = cls._context.copy()
@@ -64,17 +215,35 @@ class BatchRender:
         #         break
         if not cls._render_in_progress:
             cls._render_in_progress = True
+            if cls._render_finish_time is not None:
+                # idle time between renders (saving image, loading preset, timers)
+                cls._idle_times.append((cls._current_preset.name, time.perf_counter() - cls._render_finish_time))
+                cls._render_finish_time = None
+            cls._render_start_time = time.perf_counter()
             rez = bpy.ops.render.render('EXEC_DEFAULT')
+            if rez == {'CANCELLED'}:
+                cls._render_in_progress = False
         if rez == {'CANCELLED'}:
             # retry with timer
-            return 1.0
+            return cls._render_retry_interval
         else:
             return None
 
     @classmethod
     def _on_render_finish(cls, scene, unknown):
         # on finish render with current preset
-        cls._save_image(scene=scene)
+        cls._render_finish_time = time.perf_counter()
+        if cls._render_start_time is not None:
+            cls._render_times.append((
+                cls._current_preset.name,
+                cls._render_finish_time - cls._render_start_time,
+                cls._preset_changed and cls._state_changes.get(cls._current_preset.name, False)
+            ))
+            RenderPresetsTimings.add(stage='render', span_time=cls._render_times[-1][1])
+            cls._render_start_time = None
+        with RenderPresetsTimings.span(stage='save'):
+            cls._save_image(scene=scene)
+        cls._progress_report()
         # render wit next preset
         cls._render_nex_preset(context=cls._context)
         cls._render_in_progress = False
@@ -87,24 +256,112 @@ class BatchRender:
     @classmethod
     def _save_image(cls, scene):
         # save image from current render
-        dest_dir = RenderPresetsFileSystem.abs_path(
-            path=cls._context.preferences.addons[__package__].preferences.batch_render_output_dir
+        output_dir = cls._output_dir(context=cls._context)
+        file_name = cls.output_file_name(
+            preset_name=cls._current_preset.name,
+            frame=cls._current_frame,
+            file_extension=scene.render.file_extension
+        )
+        cls.save_render_result(
+            dest_dir=output_dir,
+            file_name=file_name
         )
+        if output_dir and cls._current_preset.name in cls._manifest_states:
+            BatchRenderManifest.update(
+                output_dir=output_dir,
+                job_key=BatchRenderManifest.job_key(preset_name=cls._current_preset.name, frame=cls._current_frame),
+                preset_state=cls._manifest_states[cls._current_preset.name],
+                output_path=os.path.join(output_dir, file_name)
+            )
+
+    @staticmethod
+    def _output_dir(context):
+        # batch render output directory
+        return RenderPresetsFileSystem.abs_path(
+            path=context.preferences.addons[__package__].preferences.batch_render_output_dir
+        )
+
+    @staticmethod
+    def save_render_result(dest_dir, file_name):
+        # save current render result to file
+        #   file is written to the destination in the background
         if dest_dir:
-            if not os.path.isdir(dest_dir):
-                os.mkdir(dest_dir)
-            file_name = cls._current_preset.name + scene.render.file_extension
-            file_path = os.path.join(dest_dir, file_name)
-            bpy.data.images['Render Result'].save_render(filepath=file_path)
+            RenderPresetsImageWriter.save_render_result(
+                dest_dir=dest_dir,
+                file_name=file_name
+            )
+
+    @classmethod
+    def _progress_report(cls):
+        # rendered frames progress
+        jobs_done = cls._jobs_count - len(cls._jobs)
+        cls._context.window_manager.progress_update(jobs_done)
+        print(
+            'B-Presets batch render "' + cls._current_preset.name + '"'
+            + ('' if cls._current_frame is None else ' frame ' + str(cls._current_frame))
+            + ' finished (' + str(jobs_done) + '/' + str(cls._jobs_count) + ')'
+        )
+
+    @classmethod
+    def _idle_times_report(cls):
+        # print idle time between renders
+        if cls._idle_times:
+            for preset_name, idle_time in cls._idle_times:
+                print('B-Presets batch render idle before "' + preset_name + '": ' + str(round(idle_time, 3)) + ' s')
+            total_idle_time = sum(idle_time for _, idle_time in cls._idle_times)
+            print(
+                'B-Presets batch render idle total: ' + str(round(total_idle_time, 3)) + ' s, '
+                + 'average: ' + str(round(total_idle_time / len(cls._idle_times), 3)) + ' s'
+            )
+
+    @classmethod
+    def _state_changes_report(cls):
+        # print time saved by the presets ordering
+        #   state change cost is estimated as the difference between average render time after the state change
+        #   and without it
+        renders_after_change = [render_time for _, render_time, state_changed in cls._render_times[1:] if state_changed]
+        renders_without_change = [
+            render_time for _, render_time, state_changed in cls._render_times[1:] if not state_changed
+        ]
+        if renders_after_change and renders_without_change:
+            state_change_time = sum(renders_after_change) / len(renders_after_change) \
+                                - sum(renders_without_change) / len(renders_without_change)
+            print(
+                'B-Presets batch render state change cost: ' + str(round(state_change_time, 3)) + ' s, '
+                + 'saved by ordering: '
+                + str(round(max(0.0, state_change_time) * (cls._state_changes_before - cls._state_changes_after), 3))
+                + ' s'
+            )
+
+    @classmethod
+    def _timings_report(cls, context):
+        # save batch render stages timings and show totals in the panel
+        RenderPresetsTimings.save_report(output_dir=cls._output_dir(context=context))
+        context.window_manager.render_presets_batch_render_summary = RenderPresetsTimings.summary()
+        print('B-Presets ' + context.window_manager.render_presets_batch_render_summary)
+        RenderPresetsTimings.stop()
 
     @classmethod
     def clear(cls):
-        cls._presets = None
+        RenderPresetsTimings.preset_name = ''
+        with RenderPresetsTimings.span(stage='save'):
+            RenderPresetsImageWriter.wait()
+        cls._idle_times_report()
+        cls._state_changes_report()
+        cls._state_changes = {}
+        cls._manifest_states = {}
+        cls._jobs = None
         cls._current_preset = None
-        RenderPresets.preset_data_to_scene(
-            context=cls._context,
-            preset_data=cls._backup
-        )
+        cls._current_frame = None
+        with RenderPresetsTimings.span(stage='restore', merge_nested=True):
+            RenderPresets.journal_to_scene(
+                context=cls._context,
+                journal=cls._backup
+            )
+            cls._context.scene.camera = cls._backup_camera
+            cls._context.scene.frame_set(cls._backup_frame)
+        cls._timings_report(context=cls._context)
+        cls._context.window_manager.progress_end()
         cls._context = None
         cls._backup = None
         cls._render_in_progress = False
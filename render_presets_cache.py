@@ -0,0 +1,75 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# LRU cache for parsed preset data
+#   cached data is validated by preset file mtime and size
+#   cache size is approximated by the decoded preset data size (preset file content length with uncompressed
+#   attributes), not by the files size because COMPACT preset files are compressed
+
+from collections import OrderedDict
+
+
+class RenderPresetsCache:
+
+    _cache = OrderedDict()  # file path: (mtime_ns, file size, preset_data, data size)
+    _cache_size = 0
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def get(cls, file_path, file_stat):
+        # returns cached preset data or None if there is no actual data in cache
+        cached = cls._cache.get(file_path)
+        if cached and cached[0] == file_stat.st_mtime_ns and cached[1] == file_stat.st_size:
+            cls._cache.move_to_end(file_path)
+            cls.hits += 1
+            return cached[2]
+        cls.misses += 1
+        return None
+
+    @classmethod
+    def put(cls, file_path, file_stat, preset_data, data_size, max_size):
+        # add preset data to cache
+        #   data_size - decoded preset data size
+        cls.remove(file_path=file_path)
+        if data_size <= max_size:
+            cls._cache[file_path] = (file_stat.st_mtime_ns, file_stat.st_size, preset_data, data_size)
+            cls._cache_size += data_size
+            # remove least recently used
+            while cls._cache_size > max_size:
+                _, (_, _, _, size) = cls._cache.popitem(last=False)
+                cls._cache_size -= size
+
+    @classmethod
+    def data_size(cls, file_path):
+        # decoded size of the cached preset data or None if preset is not cached
+        cached = cls._cache.get(file_path)
+        return cached[3] if cached else None
+
+    @classmethod
+    def remove(cls, file_path):
+        # remove preset data from cache
+        cached = cls._cache.pop(file_path, None)
+        if cached:
+            cls._cache_size -= cached[3]
+
+    @classmethod
+    def clear(cls):
+        # clear cache and counters
+        cls._cache.clear()
+        cls._cache_size = 0
+        cls.hits = 0
+        cls.misses = 0
+
+    @classmethod
+    def stats(cls):
+        # cache statistics
+        return {
+            'hits': cls.hits,
+            'misses': cls.misses,
+            'presets': len(cls._cache),
+            'size': cls._cache_size
+        }
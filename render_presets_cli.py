@@ -0,0 +1,204 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Command line mode - applying presets and batch rendering without UI
+#   blender -b scene.blend --python-exit-code 1
+#       --python-expr "import importlib; importlib.import_module('b_presets.render_presets_cli').main()"
+#       -- --presets NAME_OR_PATTERN [NAME_OR_PATTERN ...] --output-dir DIR
+#       [--presets-dir DIR] [--workers N] [--format FORMAT] [--skip | --no-skip]
+#   exit code: 0 - all presets are rendered, 1 - some preset was not found or not rendered, 2 - wrong arguments
+#   background batch render workers are started with the same entry point
+
+import argparse
+import fnmatch
+import os
+import sys
+import bpy
+from .render_presets import RenderPresets
+from .render_presets_batch_render import BatchRender
+from .render_presets_file_system import RenderPresetsFileSystem
+from .render_presets_image_writer import RenderPresetsImageWriter
+from .render_presets_manifest import BatchRenderManifest
+from .render_presets_timings import RenderPresetsTimings
+from .render_presets_workers import BatchRenderWorkers
+
+
+class RenderPresetsCli:
+
+    @classmethod
+    def main(cls, argv=None):
+        # apply presets and render, returns exit code
+        parser = cls._arguments_parser()
+        args = parser.parse_args(cls._argv() if argv is None else argv)
+        context = bpy.context
+        if __package__ not in context.preferences.addons:
+            import addon_utils
+            addon_utils.enable(__package__, default_set=True)
+        preferences = context.preferences.addons[__package__].preferences
+        if args.presets_dir:
+            preferences.presets_dir = args.presets_dir
+        if args.skip or args.no_skip:
+            preferences.batch_render_skip_rendered = args.skip
+        if args.format and args.format not in cls._file_formats(context=context):
+            # exits with code 2 as other wrong arguments
+            parser.error(
+                'unknown image format ' + args.format + ', available: ' + ', '.join(cls._file_formats(context=context))
+            )
+        output_dir = RenderPresetsFileSystem.abs_path(path=args.output_dir)
+        RenderPresets.load_presets_list(context=context)
+        presets = cls._presets_by_patterns(context=context, patterns=args.presets)
+        if presets is None:
+            return 1
+        if args.workers > 0:
+            BatchRenderWorkers.batch_render_with_presets(
+                context=context,
+                presets=presets,
+                workers_count=args.workers,
+                output_dir=output_dir,
+                file_format=args.format,
+                blocking=True
+            )
+            return 1 if BatchRenderWorkers.failed_presets() else 0
+        # render in this process
+        if args.frames:
+            jobs = [(preset, int(frame)) for preset in presets for frame in args.frames.split(',')]
+        else:
+            jobs = BatchRender.jobs(context=context, presets=presets)
+        # with the result file rendered frames are reported to the caller (batch render workers pool)
+        states = {}
+        if not args.result_file:
+            states = BatchRenderManifest.preset_states(
+                context=context,
+                presets=presets,
+                file_format=args.format
+            )
+            if preferences.batch_render_skip_rendered:
+                jobs = BatchRenderManifest.not_rendered_jobs(
+                    jobs=jobs,
+                    states=states,
+                    output_dir=output_dir
+                )
+        presets_frames = {}
+        for preset, frame in jobs:
+            presets_frames.setdefault(preset.name, []).append(frame)
+        rez = 0
+        camera = context.scene.camera
+        RenderPresetsTimings.start()
+        for preset_name, frames in presets_frames.items():
+            context.scene.camera = camera
+            RenderPresetsTimings.preset_name = preset_name
+            try:
+                for frame, output_path in cls._render_preset(
+                        context=context,
+                        preset_name=preset_name,
+                        frames=frames,
+                        output_dir=output_dir,
+                        file_format=args.format
+                ):
+                    if args.result_file:
+                        with open(file=args.result_file, mode='a', encoding='utf8') as result_file:
+                            result_file.write(('' if frame is None else str(frame)) + '\t' + output_path + '\n')
+                    else:
+                        BatchRenderManifest.update(
+                            output_dir=output_dir,
+                            job_key=BatchRenderManifest.job_key(preset_name=preset_name, frame=frame),
+                            preset_state=states[preset_name],
+                            output_path=output_path
+                        )
+            except Exception as exception:
+                print('ERR: B-Presets render with "' + preset_name + '" failed: ', exception)
+                rez = 1
+        RenderPresetsTimings.preset_name = ''
+        with RenderPresetsTimings.span(stage='save'):
+            RenderPresetsImageWriter.wait()
+        if not args.result_file:
+            RenderPresetsTimings.save_report(output_dir=output_dir)
+            print('B-Presets ' + RenderPresetsTimings.summary())
+        RenderPresetsTimings.stop()
+        return rez
+
+    @classmethod
+    def _render_preset(cls, context, preset_name, frames: list, output_dir, file_format=None):
+        # apply preset and render its frames, yields (frame, output file path) for each rendered frame
+        preset_data = RenderPresets.preset_data(
+            context=context,
+            preset_name=preset_name
+        )
+        if not preset_data:
+            raise FileNotFoundError('Preset not found: ' + preset_name)
+        RenderPresets.preset_data_to_scene(
+            context=context,
+            preset_data=preset_data
+        )
+        if file_format:
+            context.scene.render.image_settings.file_format = file_format
+        for frame in frames:
+            if frame is not None:
+                context.scene.frame_set(frame)
+            with RenderPresetsTimings.span(stage='render'):
+                bpy.ops.render.render()
+            file_name = BatchRender.output_file_name(
+                preset_name=preset_name,
+                frame=frame,
+                file_extension=context.scene.render.file_extension
+            )
+            with RenderPresetsTimings.span(stage='save'):
+                BatchRender.save_render_result(
+                    dest_dir=output_dir,
+                    file_name=file_name
+                )
+            print('B-Presets render "' + preset_name + '"' + ('' if frame is None else ' frame ' + str(frame)) + ' finished')
+            yield frame, os.path.join(output_dir, file_name)
+
+    @staticmethod
+    def _presets_by_patterns(context, patterns: list):
+        # presets from the presets list by names or glob patterns ("Final*"), None if some pattern matches nothing
+        presets = context.window_manager.render_presets_presets
+        matched = [preset for preset in presets if any(fnmatch.fnmatchcase(preset.name, pattern) for pattern in patterns)]
+        not_matched = [
+            pattern for pattern in patterns if not any(fnmatch.fnmatchcase(preset.name, pattern) for preset in presets)
+        ]
+        if not_matched:
+            print('ERR: presets not found: ' + ', '.join(not_matched))
+            return None
+        return matched
+
+    @staticmethod
+    def _file_formats(context):
+        # available image file formats
+        return context.scene.render.image_settings.bl_rna.properties['file_format'].enum_items.keys()
+
+    @staticmethod
+    def _arguments_parser():
+        # command line arguments (after "--")
+        parser = argparse.ArgumentParser(
+            prog='blender -b scene.blend --python-expr "..." --',
+            description='B-Presets: apply render presets and render'
+        )
+        parser.add_argument('--presets', nargs='+', required=True, help='presets names or glob patterns')
+        parser.add_argument('--output-dir', required=True, help='directory to save rendered images')
+        parser.add_argument('--presets-dir', help='presets directory (default - from the add-on preferences)')
+        parser.add_argument('--workers', type=int, default=0, help='number of background Blender processes')
+        parser.add_argument('--format', help='image file format (PNG, JPEG, OPEN_EXR, ...), default - from preset')
+        skip_group = parser.add_mutually_exclusive_group()
+        skip_group.add_argument('--skip', action='store_true', help='skip presets which output is up to date')
+        skip_group.add_argument('--no-skip', action='store_true', help='render presets which output is up to date')
+        # used by the batch render workers
+        parser.add_argument('--frames', help=argparse.SUPPRESS)
+        parser.add_argument('--result-file', help=argparse.SUPPRESS)
+        return parser
+
+    @staticmethod
+    def _argv():
+        # script arguments - after "--" in the Blender command line
+        return sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+
+def main():
+    # command line entry point
+    rez = RenderPresetsCli.main()
+    if rez:
+        sys.exit(rez)
@@ -6,11 +6,22 @@
 
 import bpy
 import os
+import stat
 import tempfile
 
 
+def _umask():
+    # current process umask (can be read only by setting it)
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
 class RenderPresetsFileSystem:
 
+    # permissions for the new files - temporary files are created with 0o600
+    _new_file_mode = 0o666 & ~_umask()
+
     @staticmethod
     def abs_path(path):
         # returns absolute file path from path
@@ -20,3 +31,37 @@ class RenderPresetsFileSystem:
             return os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(bpy.data.filepath)), path[2:]))
         else:
             return os.path.abspath(path)
+
+    @staticmethod
+    def files(path, files_ext: tuple):
+        # returns sorted list of file names with extensions from files_ext in the directory
+        #   one os.scandir pass, file type comes from the directory entry
+        with os.scandir(path) as entries:
+            return sorted(entry.name for entry in entries if entry.name.endswith(files_ext) and entry.is_file())
+
+    @classmethod
+    def write_atomic(cls, file_path, content):
+        # write content (str or bytes) to file through the temporary file
+        #   file is replaced only after all content is written so it can't be truncated on crash
+        #   temporary file name is unique - the same file can be written from several threads (index)
+        if isinstance(content, str):
+            content = content.encode('utf8')
+        tmp_file_descriptor, tmp_file_path = tempfile.mkstemp(
+            dir=os.path.dirname(file_path),
+            prefix=os.path.basename(file_path) + '.',
+            suffix='.tmp'
+        )
+        try:
+            with open(tmp_file_descriptor, mode='wb') as tmp_file:
+                tmp_file.write(content)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            try:
+                file_mode = stat.S_IMODE(os.stat(file_path).st_mode)
+            except OSError:
+                file_mode = cls._new_file_mode
+            os.chmod(tmp_file_path, file_mode)
+            os.replace(tmp_file_path, file_path)
+        finally:
+            if os.path.exists(tmp_file_path):
+                os.remove(tmp_file_path)
@@ -0,0 +1,126 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Preset files formats
+#   JSON - pretty-printed json, "attributes" is always the last key
+#   COMPACT - signature + version + metadata header (json) + zlib compressed attributes
+#       attributes are stored as [owner index, identifier, value] with the interned owner paths
+#       ('context.scene.render', ...) so path prefixes are not repeated for each attribute
+#       values keep their json types, complex values (CurveMapping, set) keep their {class: ..., instance: ...} form
+
+import json
+import struct
+import zlib
+
+
+class RenderPresetsFormat:
+
+    json_ext = 'json'
+    compact_ext = 'bpreset'
+    files_ext = (json_ext, compact_ext)
+
+    _json_attributes_marker = b'\n    "attributes": '
+    _compact_signature = b'BPRC'
+    _compact_version = 1
+    _compact_header = struct.Struct('>4sBI')    # signature, version, metadata length
+
+    @classmethod
+    def file_ext(cls, file_format):
+        # preset file extension for format
+        return cls.compact_ext if file_format == 'COMPACT' else cls.json_ext
+
+    @classmethod
+    def file_format(cls, content: bytes):
+        # detect preset file format by its content
+        return 'COMPACT' if content[:len(cls._compact_signature)] == cls._compact_signature else 'JSON'
+
+    @classmethod
+    def loads_sized(cls, content: bytes):
+        # preset data and its decoded size (content length with uncompressed attributes) from preset file content
+        if cls.file_format(content=content) == 'COMPACT':
+            metadata, payload_position = cls._compact_metadata(content=content)
+            payload_content = zlib.decompress(content[payload_position:])
+            payload = json.loads(payload_content.decode('utf8'))
+            owners = payload['owners']
+            metadata['attributes'] = {
+                owners[owner_index] + '.' + identifier: value
+                for owner_index, identifier, value in payload['attributes']
+            }
+            return metadata, payload_position + len(payload_content)
+        else:
+            return json.loads(content.decode('utf8')), len(content)
+
+    @classmethod
+    def dumps(cls, preset_data, file_format='JSON'):
+        # preset file content from preset data
+        return cls.dumps_sized(preset_data=preset_data, file_format=file_format)[0]
+
+    @classmethod
+    def dumps_sized(cls, preset_data, file_format='JSON'):
+        # preset file content and its decoded size (content length with uncompressed attributes) from preset data
+        metadata = {key: value for key, value in preset_data.items() if key != 'attributes'}
+        if file_format == 'COMPACT':
+            owners = {}
+            attributes = []
+            for attribute, value in preset_data['attributes'].items():
+                owner, identifier = attribute.rsplit('.', maxsplit=1)
+                attributes.append([owners.setdefault(owner, len(owners)), identifier, value])
+            payload = json.dumps(
+                {'owners': list(owners), 'attributes': attributes},
+                ensure_ascii=False, separators=(',', ':')
+            ).encode('utf8')
+            metadata_content = cls._compact_metadata_content(metadata=metadata)
+            return metadata_content + zlib.compress(payload, 6), len(metadata_content) + len(payload)
+        else:
+            # attributes always last - to replace metadata without re-serializing attributes
+            metadata['attributes'] = preset_data['attributes']
+            content = json.dumps(metadata, indent=4, ensure_ascii=False, sort_keys=False).encode('utf8')
+            return content, len(content)
+
+    @classmethod
+    def metadata(cls, content: bytes):
+        # only preset metadata (without attributes) from preset file content
+        if cls.file_format(content=content) == 'COMPACT':
+            return cls._compact_metadata(content=content)[0]
+        else:
+            metadata = json.loads(content.decode('utf8'))
+            metadata.pop('attributes', None)
+            return metadata
+
+    @classmethod
+    def replace_metadata(cls, content: bytes, preset_data):
+        # preset file content with changed metadata, attributes are copied as is
+        #   returns None if metadata can't be replaced without re-serializing attributes
+        metadata = {key: value for key, value in preset_data.items() if key != 'attributes'}
+        if cls.file_format(content=content) == 'COMPACT':
+            _, payload_position = cls._compact_metadata(content=content)
+            return cls._compact_metadata_content(metadata=metadata) + content[payload_position:]
+        else:
+            attributes_position = content.find(cls._json_attributes_marker)
+            if attributes_position < 0 or list(preset_data)[-1] != 'attributes':
+                return None
+            metadata_content = json.dumps(metadata, indent=4, ensure_ascii=False, sort_keys=False).encode('utf8')
+            # b'{\n    "key": value\n}' -> b'{\n    "key": value,' + b'\n    "attributes": {...}\n}'
+            metadata_content = metadata_content[:-2] + b',' if metadata else b'{'
+            return metadata_content + content[attributes_position:]
+
+    @classmethod
+    def _compact_metadata(cls, content: bytes):
+        # metadata and attributes payload position from compact preset file content
+        signature, version, metadata_length = cls._compact_header.unpack_from(content)
+        if version > cls._compact_version:
+            raise ValueError('Preset saved with newer B-Presets version (compact format ' + str(version) + ')')
+        metadata_position = cls._compact_header.size
+        metadata = json.loads(content[metadata_position:metadata_position + metadata_length].decode('utf8'))
+        return metadata, metadata_position + metadata_length
+
+    @classmethod
+    def _compact_metadata_content(cls, metadata):
+        # compact preset file header with metadata
+        metadata_content = json.dumps(metadata, ensure_ascii=False, separators=(',', ':')).encode('utf8')
+        return cls._compact_header.pack(
+            cls._compact_signature, cls._compact_version, len(metadata_content)
+        ) + metadata_content
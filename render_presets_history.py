@@ -0,0 +1,88 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Applied presets history - stepping back and forward through the applied presets
+#   each entry keeps only the attributes changed by the applied preset: values before (the preset apply journal)
+#   and after applying, so stepping is O(changed attributes)
+#   the number of entries and their approximate memory size are limited, the oldest entries are removed first
+
+import json
+from .render_presets import RenderPresets
+
+
+class RenderPresetsHistory:
+
+    _entries = []   # {'name': preset name, 'before': journal, 'after': journal, 'size': approximate size}
+    _position = 0   # number of entries applied to the scene
+    _size = 0
+
+    @classmethod
+    def push(cls, context, preset_name, journal: dict):
+        # add applied preset to the history
+        #   entries after the current position (stepped back) are removed
+        for entry in cls._entries[cls._position:]:
+            cls._size -= entry['size']
+        del cls._entries[cls._position:]
+        after = RenderPresets.journal_current_values(context=context, journal=journal)
+        # only attributes really changed by the preset
+        before = RenderPresets.new_journal()
+        before['camera_name'] = journal['camera_name']
+        for attribute_text, attribute in journal['attributes'].items():
+            if attribute_text in after['attributes'] and after['attributes'][attribute_text] != attribute:
+                before['attributes'][attribute_text] = attribute
+        after['attributes'] = {
+            attribute_text: after['attributes'][attribute_text] for attribute_text in before['attributes']
+        }
+        entry = {
+            'name': preset_name,
+            'before': before,
+            'after': after
+        }
+        entry['size'] = len(json.dumps([entry['before'], entry['after']], ensure_ascii=False))
+        cls._entries.append(entry)
+        cls._size += entry['size']
+        preferences = context.preferences.addons[__package__].preferences
+        max_size = preferences.history_memory_size * 1024 * 1024
+        while len(cls._entries) > 1 and (len(cls._entries) > preferences.history_steps or cls._size > max_size):
+            cls._size -= cls._entries.pop(0)['size']
+        cls._position = len(cls._entries)
+
+    @classmethod
+    def previous(cls, context):
+        # return scene to the state before the last applied preset
+        if cls.has_previous():
+            cls._position -= 1
+            RenderPresets.journal_to_scene(
+                context=context,
+                journal=cls._entries[cls._position]['before']
+            )
+            return cls._entries[cls._position]['name']
+
+    @classmethod
+    def next(cls, context):
+        # apply the next preset from the history again
+        if cls.has_next():
+            RenderPresets.preset_data_to_scene(
+                context=context,
+                preset_data=cls._entries[cls._position]['after'],
+                backup=False
+            )
+            cls._position += 1
+            return cls._entries[cls._position - 1]['name']
+
+    @classmethod
+    def has_previous(cls):
+        return cls._position > 0
+
+    @classmethod
+    def has_next(cls):
+        return cls._position < len(cls._entries)
+
+    @classmethod
+    def clear(cls):
+        cls._entries = []
+        cls._position = 0
+        cls._size = 0
@@ -0,0 +1,93 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Render results saving out of the render critical path
+#   if the destination is a network storage - render result is saved to the local temporary directory and moved
+#   to the destination in the background thread, to the local destination it is saved directly
+#   the number of not yet moved files is limited - saving waits if the queue is full
+
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+import bpy
+
+
+class RenderPresetsImageWriter:
+
+    max_in_flight = 4
+    _queue = None
+    _thread = None
+    _network_dirs = {}      # directory: is on the network storage
+    _network_fs_types = ('nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', '9p', 'fuse.sshfs', 'davfs', 'ncpfs')
+
+    @classmethod
+    def save_render_result(cls, dest_dir, file_name):
+        # save current render result to dest_dir/file_name
+        os.makedirs(dest_dir, exist_ok=True)
+        if not cls._is_network_dir(dir_path=dest_dir):
+            # local storage - moving through the temporary directory gives nothing but the extra copy
+            bpy.data.images['Render Result'].save_render(filepath=os.path.join(dest_dir, file_name))
+            return
+        tmp_file_path = os.path.join(tempfile.gettempdir(), 'b_presets_' + uuid.uuid4().hex + '_' + file_name)
+        bpy.data.images['Render Result'].save_render(filepath=tmp_file_path)
+        cls._start()
+        cls._queue.put((tmp_file_path, os.path.join(dest_dir, file_name)))
+
+    @classmethod
+    def wait(cls):
+        # wait until all saved render results are moved to their destinations
+        if cls._queue is not None:
+            cls._queue.join()
+
+    @classmethod
+    def _is_network_dir(cls, dir_path):
+        # directory is on the network storage (UNC path, mapped network drive, network file system mount)
+        if dir_path not in cls._network_dirs:
+            is_network = dir_path.startswith(('\\\\', '//'))
+            real_dir_path = os.path.realpath(dir_path)
+            if not is_network and sys.platform == 'win32':
+                import ctypes
+                drive_remote = 4
+                is_network = ctypes.windll.kernel32.GetDriveTypeW(os.path.splitdrive(real_dir_path)[0] + '\\') == drive_remote
+            elif not is_network and os.path.isfile('/proc/mounts'):
+                # file system type of the nearest mount point
+                mount_point, fs_type = '', ''
+                try:
+                    with open(file='/proc/mounts', mode='r', encoding='utf8') as mounts_file:
+                        for line in mounts_file:
+                            fields = line.split()
+                            if len(fields) > 2 and len(fields[1]) > len(mount_point) \
+                                    and (real_dir_path == fields[1] or real_dir_path.startswith(fields[1].rstrip('/') + '/')):
+                                mount_point, fs_type = fields[1], fields[2]
+                except OSError as exception:
+                    print('ERR: ', exception)
+                is_network = fs_type in cls._network_fs_types
+            cls._network_dirs[dir_path] = is_network
+        return cls._network_dirs[dir_path]
+
+    @classmethod
+    def _start(cls):
+        # start background writing thread
+        if cls._thread is None or not cls._thread.is_alive():
+            cls._queue = queue.Queue(maxsize=cls.max_in_flight)
+            cls._thread = threading.Thread(target=cls._write, daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _write(cls):
+        # background thread - move saved render results to destination
+        while True:
+            tmp_file_path, file_path = cls._queue.get()
+            try:
+                shutil.move(tmp_file_path, file_path)
+            except OSError as exception:
+                print('ERR: ', exception)
+            finally:
+                cls._queue.task_done()
@@ -0,0 +1,94 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Presets index - light preset data (name, locked, camera, parent, render animation, sections) stored in the presets folder
+#   to not parse all preset files on each presets list loading
+#   index entries are validated by file mtime and size and re-read only for changed files
+
+import hashlib
+import json
+import os
+import struct
+import zlib
+from .render_presets_file_system import RenderPresetsFileSystem
+from .render_presets_format import RenderPresetsFormat
+
+
+class RenderPresetsIndex:
+
+    _index_file_name = '.b_presets_index'
+    _index_version = 4
+
+    @classmethod
+    def entries(cls, presets_folder_path, files):
+        # generator to get (file name, index entry) for preset files
+        #   index entry is None if preset file can't be read
+        #   index is saved after all entries are got
+        index = cls._load(presets_folder_path=presets_folder_path)
+        new_index = {}
+        changed = False
+        for file_name in files:
+            file_path = os.path.join(presets_folder_path, file_name)
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                continue
+            entry = index.get(file_name)
+            if entry is None or entry['mtime_ns'] != file_stat.st_mtime_ns or entry['size'] != file_stat.st_size:
+                entry = cls._entry(file_path=file_path, file_stat=file_stat)
+                changed = True
+            if entry:
+                new_index[file_name] = entry
+            yield file_name, entry
+        if changed or len(new_index) != len(index):
+            cls._save(presets_folder_path=presets_folder_path, index=new_index)
+
+    @classmethod
+    def _entry(cls, file_path, file_stat):
+        # index entry from preset file
+        try:
+            with open(file=file_path, mode='rb') as preset_file:
+                content = preset_file.read()
+            preset_data = RenderPresetsFormat.metadata(content=content)
+        except (OSError, ValueError, struct.error, zlib.error) as exception:
+            print('ERR: ', exception)
+            return None
+        return {
+            'name': os.path.splitext(os.path.basename(file_path))[0],
+            'locked': preset_data.get('locked', False),
+            'camera_name': preset_data.get('camera_name', ''),
+            'parent': preset_data.get('parent', ''),
+            'render_animation': preset_data.get('render_animation', False),
+            'sections': preset_data.get('sections'),
+            'mtime_ns': file_stat.st_mtime_ns,
+            'size': file_stat.st_size,
+            'hash': hashlib.sha1(content).hexdigest()
+        }
+
+    @classmethod
+    def _load(cls, presets_folder_path):
+        # load index from the presets folder
+        index_path = os.path.join(presets_folder_path, cls._index_file_name)
+        try:
+            with open(file=index_path, mode='r', encoding='utf8') as index_file:
+                index_data = json.load(index_file)
+        except (OSError, ValueError):
+            return {}
+        if index_data.get('version') != cls._index_version:
+            return {}
+        return index_data.get('presets', {})
+
+    @classmethod
+    def _save(cls, presets_folder_path, index):
+        # save index to the presets folder
+        #   presets folder can be read-only (shared library) - index is just not saved then
+        try:
+            RenderPresetsFileSystem.write_atomic(
+                file_path=os.path.join(presets_folder_path, cls._index_file_name),
+                content=json.dumps({'version': cls._index_version, 'presets': index}, ensure_ascii=False)
+            )
+        except OSError as exception:
+            print('ERR: ', exception)
@@ -0,0 +1,152 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Batch render manifest - rendered presets info stored in the output directory
+#   presets rendered with the same preset content, .blend file and camera are not rendered again
+#   so the interrupted batch render continues from the place where it stopped
+#   animation presets have separate entries for each frame ("preset name:frame")
+#   rendered frames are appended to the journal file (one json line per frame) so each frame costs one small write,
+#   the journal is merged into the manifest file when the manifest is loaded (on the batch render start)
+
+import hashlib
+import json
+import os
+import time
+import bpy
+from .render_presets import RenderPresets
+from .render_presets_file_system import RenderPresetsFileSystem
+
+
+class BatchRenderManifest:
+
+    _manifest_file_name = 'b_presets_batch_manifest.json'
+    _journal_file_name = 'b_presets_batch_manifest.journal'
+
+    @classmethod
+    def preset_states(cls, context, presets: list, file_format=None):
+        # render states of presets {preset name: state}
+        #   file_format - image file format which overrides the preset file format
+        return {
+            preset.name: cls.preset_state(context=context, preset_name=preset.name, file_format=file_format)
+            for preset in presets
+        }
+
+    @classmethod
+    def preset_state(cls, context, preset_name, file_format=None):
+        # preset render state - preset content hash, .blend file modification time, camera, output file format
+        #   .blend file with unsaved changes has no modification time - scene can be changed, the preset is rendered
+        preset_data = RenderPresets.preset_data(
+            context=context,
+            preset_name=preset_name
+        )
+        camera_name = preset_data.get('camera_name', '') if preset_data else ''
+        if not (camera_name in context.scene.objects and context.scene.objects[camera_name].type == 'CAMERA'):
+            camera_name = context.scene.camera.name if context.scene.camera else ''
+        # output file format - from arguments, from the preset or the scene format if the preset has no format
+        if not file_format and preset_data:
+            file_format = preset_data['attributes'].get('context.scene.render.image_settings.file_format')
+        if not file_format:
+            file_format = context.scene.render.image_settings.file_format
+        return {
+            'hash': cls._preset_data_hash(preset_data=preset_data),
+            'blend_mtime': os.path.getmtime(bpy.data.filepath) if bpy.data.filepath and not bpy.data.is_dirty else None,
+            'camera': camera_name,
+            'file_format': file_format
+        }
+
+    @staticmethod
+    def _preset_data_hash(preset_data):
+        # preset content hash - resolved attributes (with inherited from the parent presets), camera, render mode
+        #   and applied sections
+        if not preset_data:
+            return None
+        return hashlib.sha1(
+            json.dumps(
+                [
+                    preset_data.get('camera_name', ''),
+                    preset_data.get('render_animation', False),
+                    preset_data.get('sections'),
+                    preset_data['attributes']
+                ],
+                ensure_ascii=False, sort_keys=True
+            ).encode('utf8')
+        ).hexdigest()
+
+    @staticmethod
+    def job_key(preset_name, frame=None):
+        # manifest entry key for preset (single frame) or for preset animation frame
+        #   ":" is not allowed in the presets names
+        return preset_name if frame is None else preset_name + ':' + str(frame)
+
+    @classmethod
+    def is_up_to_date(cls, manifest, job_key, preset_state):
+        # preset was already rendered with the same state and its output file exists
+        entry = manifest.get(job_key)
+        return entry is not None \
+            and preset_state['hash'] is not None \
+            and preset_state['blend_mtime'] is not None \
+            and all(entry.get(key) == value for key, value in preset_state.items()) \
+            and os.path.isfile(entry['output_path'])
+
+    @classmethod
+    def load(cls, output_dir):
+        # load manifest from the output directory
+        #   entries from the journal are merged into the manifest file and the journal is removed
+        manifest_path = os.path.join(output_dir, cls._manifest_file_name)
+        journal_path = os.path.join(output_dir, cls._journal_file_name)
+        try:
+            with open(file=manifest_path, mode='r', encoding='utf8') as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            manifest = {}
+        try:
+            with open(file=journal_path, mode='r', encoding='utf8') as journal_file:
+                for line in journal_file:
+                    try:
+                        job_key, entry = json.loads(line)
+                    except ValueError:
+                        # line broken by the interrupted writing
+                        continue
+                    manifest[job_key] = entry
+        except OSError:
+            return manifest
+        try:
+            RenderPresetsFileSystem.write_atomic(
+                file_path=manifest_path,
+                content=json.dumps(manifest, indent=4, ensure_ascii=False)
+            )
+            os.remove(journal_path)
+        except OSError as exception:
+            print('ERR: ', exception)
+        return manifest
+
+    @classmethod
+    def update(cls, output_dir, job_key, preset_state, output_path):
+        # add rendered preset (frame) to the manifest journal
+        entry = dict(preset_state, output_path=output_path, rendered=time.time())
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            with open(file=os.path.join(output_dir, cls._journal_file_name), mode='a', encoding='utf8') as journal_file:
+                # line starts with the new line - to separate it from the line broken by the interrupted writing
+                journal_file.write('\n' + json.dumps([job_key, entry], ensure_ascii=False))
+        except OSError as exception:
+            print('ERR: ', exception)
+
+    @classmethod
+    def not_rendered_jobs(cls, jobs: list, states: dict, output_dir):
+        # returns jobs (preset, frame) which are not rendered yet or were changed after rendering
+        manifest = cls.load(output_dir=output_dir)
+        rez = [
+            (preset, frame) for preset, frame in jobs
+            if not cls.is_up_to_date(
+                manifest=manifest,
+                job_key=cls.job_key(preset_name=preset.name, frame=frame),
+                preset_state=states[preset.name]
+            )
+        ]
+        if len(rez) < len(jobs):
+            print('B-Presets batch render: ' + str(len(jobs) - len(rez)) + ' frames are up to date, skipped')
+        return rez
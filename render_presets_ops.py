@@ -5,11 +5,15 @@
 #   https://github.com/Korchy/blender_b_presets
 
 import bpy
-from bpy.props import IntProperty
+from bpy.props import IntProperty, EnumProperty
 from bpy.types import Operator
 from bpy.utils import register_class, unregister_class
 from .render_presets import RenderPresets
 from .render_presets_batch_render import BatchRender
+from .render_presets_history import RenderPresetsHistory
+from .render_presets_profiler import RenderPresetsProfiler
+from .render_presets_registry import RenderPresetsRegistry
+from .render_presets_workers import BatchRenderWorkers
 
 
 class RENDER_PRESETS_OT_add_new_preset(Operator):
@@ -24,6 +28,34 @@ class RENDER_PRESETS_OT_add_new_preset(Operator):
         return {'FINISHED'}
 
 
+class RENDER_PRESETS_OT_add_delta_preset(Operator):
+    bl_idname = 'render_presets.add_delta_preset'
+    bl_label = 'Add delta preset'
+    bl_description = 'B-Presets: Add new preset which saves only settings different from the base'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    base: EnumProperty(
+        name='Base',
+        items=[
+            ('ACTIVE', 'Active preset', 'Save only settings different from the active preset'),
+            ('DEFAULTS', 'Blender defaults', 'Save only settings different from the Blender default values')
+        ],
+        default='ACTIVE'
+    )
+
+    def execute(self, context):
+        # create new delta preset
+        if self.base == 'DEFAULTS':
+            parent = RenderPresets.defaults_preset_name
+        elif 0 <= context.window_manager.render_presets_active_preset < len(context.window_manager.render_presets_presets):
+            parent = context.window_manager.render_presets_presets[context.window_manager.render_presets_active_preset].name
+        else:
+            bpy.ops.render_presets.messagebox('INVOKE_DEFAULT', message='No active preset!')
+            return {'CANCELLED'}
+        RenderPresets.add_new_preset(context=context, parent=parent)
+        return {'FINISHED'}
+
+
 class RENDER_PRESETS_OT_remove_active_preset(Operator):
     bl_idname = 'render_presets.remove_active_preset'
     bl_label = 'Remove active preset'
@@ -41,7 +73,7 @@ class RENDER_PRESETS_OT_remove_active_preset(Operator):
 
     @classmethod
     def poll(cls, context):
-        if 0 <= context.window_manager.render_presets_active_preset < len(context.window_manager.render_presets_presets):
+        if 0 <= context.window_manager.render_presets_active_preset < RenderPresetsRegistry.count():
             return True
         else:
             return False
@@ -55,7 +87,7 @@ class RENDER_PRESETS_OT_reload_presets(Operator):
 
     def execute(self, context):
         # reload presets list from files
-        RenderPresets.load_presets_list(context=context)
+        RenderPresets.load_presets_list(context=context, background=True)
         return {'FINISHED'}
 
 
@@ -75,7 +107,7 @@ class RENDER_PRESETS_OT_scene_to_preset(Operator):
 
     @classmethod
     def poll(cls, context):
-        if 0 <= context.window_manager.render_presets_active_preset < len(context.window_manager.render_presets_presets)\
+        if 0 <= context.window_manager.render_presets_active_preset < RenderPresetsRegistry.count()\
                 and not context.window_manager.render_presets_presets[context.window_manager.render_presets_active_preset].locked:
             return True
         else:
@@ -97,15 +129,24 @@ class RENDER_PRESETS_OT_preset_to_scene(Operator):
         active_preset_id = context.window_manager.render_presets_active_preset
         if active_preset_id != self.preset_id:
             context.window_manager.render_presets_active_preset = self.preset_id
+        preset = context.window_manager.render_presets_presets[context.window_manager.render_presets_active_preset]
+        journal = RenderPresets.new_journal()
         RenderPresets.preset_to_scene(
             context=context,
-            preset=context.window_manager.render_presets_presets[context.window_manager.render_presets_active_preset]
+            preset=preset,
+            journal=journal
         )
+        RenderPresetsHistory.push(
+            context=context,
+            preset_name=preset.name,
+            journal=journal
+        )
+        self.report({'INFO'}, 'Changed properties: ' + str(RenderPresets.last_applied_count))
         return {'FINISHED'}
 
     @classmethod
     def poll(cls, context):
-        if 0 <= context.window_manager.render_presets_active_preset < len(context.window_manager.render_presets_presets):
+        if 0 <= context.window_manager.render_presets_active_preset < RenderPresetsRegistry.count():
             return True
         else:
             return False
@@ -119,16 +160,25 @@ class RENDER_PRESETS_OT_render_checked_presets(Operator):
 
     def execute(self, context):
         # render with checked presets
-        BatchRender.batch_render_with_presets(
-            context=context,
-            presets=[preset for preset in context.window_manager.render_presets_presets if preset.checked]
-        )
+        workers_count = context.preferences.addons[__package__].preferences.batch_render_workers
+        if workers_count > 0:
+            # in background Blender processes
+            BatchRenderWorkers.batch_render_with_presets(
+                context=context,
+                presets=[preset for preset in context.window_manager.render_presets_presets if preset.checked],
+                workers_count=workers_count
+            )
+        else:
+            BatchRender.batch_render_with_presets(
+                context=context,
+                presets=[preset for preset in context.window_manager.render_presets_presets if preset.checked]
+            )
         return {'FINISHED'}
 
     @classmethod
     def poll(cls, context):
-        if len(context.window_manager.render_presets_presets) > 0\
-                and next((preset for preset in context.window_manager.render_presets_presets if preset.checked), None):
+        if RenderPresetsRegistry.checked_count() > 0\
+                and not BatchRenderWorkers.is_running():
             return True
         else:
             return False
@@ -145,24 +195,104 @@ class RENDER_PRESETS_OT_restore_from_backup(Operator):
         RenderPresets.restore_scene(
             context=context
         )
+        # history states are not valid after the scene is restored
+        RenderPresetsHistory.clear()
+        return {'FINISHED'}
+
+
+class RENDER_PRESETS_OT_previous_state(Operator):
+    bl_idname = 'render_presets.previous_state'
+    bl_label = 'Previous state'
+    bl_description = 'B-Presets: Return scene to the state before the last applied preset'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        # step back in the applied presets history
+        preset_name = RenderPresetsHistory.previous(
+            context=context
+        )
+        self.report({'INFO'}, 'Reverted: ' + preset_name)
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        return RenderPresetsHistory.has_previous()
+
+
+class RENDER_PRESETS_OT_next_state(Operator):
+    bl_idname = 'render_presets.next_state'
+    bl_label = 'Next state'
+    bl_description = 'B-Presets: Apply the next preset from the applied presets history again'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        # step forward in the applied presets history
+        preset_name = RenderPresetsHistory.next(
+            context=context
+        )
+        self.report({'INFO'}, 'Applied: ' + preset_name)
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        return RenderPresetsHistory.has_next()
+
+
+class RENDER_PRESETS_OT_convert_presets(Operator):
+    bl_idname = 'render_presets.convert_presets'
+    bl_label = 'Convert presets'
+    bl_description = 'B-Presets: Convert all presets files to the selected format'
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        # convert presets files
+        converted = RenderPresets.convert_presets(context=context)
+        self.report({'INFO'}, 'Converted presets: ' + str(converted))
         return {'FINISHED'}
 
 
+class RENDER_PRESETS_OT_profile_last_operation(Operator):
+    bl_idname = 'render_presets.profile_last_operation'
+    bl_label = 'Profile last operation'
+    bl_description = 'B-Presets: Save profile of the last presets operation to the temporary directory'
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        # save last profiled operation
+        file_path = RenderPresetsProfiler.save_last_profile()
+        self.report({'INFO'}, 'Profile saved: ' + file_path)
+        return {'FINISHED'}
+
+    @classmethod
+    def poll(cls, context):
+        return RenderPresetsProfiler.has_last_profile()
+
+
 def register():
     register_class(RENDER_PRESETS_OT_add_new_preset)
+    register_class(RENDER_PRESETS_OT_add_delta_preset)
     register_class(RENDER_PRESETS_OT_remove_active_preset)
     register_class(RENDER_PRESETS_OT_reload_presets)
     register_class(RENDER_PRESETS_OT_preset_to_scene)
     register_class(RENDER_PRESETS_OT_scene_to_preset)
     register_class(RENDER_PRESETS_OT_render_checked_presets)
     register_class(RENDER_PRESETS_OT_restore_from_backup)
+    register_class(RENDER_PRESETS_OT_previous_state)
+    register_class(RENDER_PRESETS_OT_next_state)
+    register_class(RENDER_PRESETS_OT_convert_presets)
+    register_class(RENDER_PRESETS_OT_profile_last_operation)
 
 
 def unregister():
+    unregister_class(RENDER_PRESETS_OT_profile_last_operation)
+    unregister_class(RENDER_PRESETS_OT_convert_presets)
+    unregister_class(RENDER_PRESETS_OT_next_state)
+    unregister_class(RENDER_PRESETS_OT_previous_state)
     unregister_class(RENDER_PRESETS_OT_restore_from_backup)
     unregister_class(RENDER_PRESETS_OT_render_checked_presets)
     unregister_class(RENDER_PRESETS_OT_scene_to_preset)
     unregister_class(RENDER_PRESETS_OT_preset_to_scene)
     unregister_class(RENDER_PRESETS_OT_reload_presets)
     unregister_class(RENDER_PRESETS_OT_remove_active_preset)
+    unregister_class(RENDER_PRESETS_OT_add_delta_preset)
     unregister_class(RENDER_PRESETS_OT_add_new_preset)
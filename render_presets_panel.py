@@ -28,6 +28,7 @@ class RENDER_PRESETS_PT_panel(Panel):
         )
         col = row.column(align=True)
         col.operator('render_presets.add_new_preset', icon='ADD', text='')
+        col.operator_menu_enum('render_presets.add_delta_preset', 'base', icon='LINKED', text='')
         col.operator('render_presets.remove_active_preset', icon='REMOVE', text='')
         col.separator()
         col.operator('render_presets.reload_presets', icon='FILE_REFRESH', text='')
@@ -36,7 +37,17 @@ class RENDER_PRESETS_PT_panel(Panel):
         row = layout.row()
         row.operator('render_presets.scene_to_preset', icon='EXPORT')
         row.operator('render_presets.render_checked_presets', icon='SCENE')
+        row.operator('render_presets.previous_state', icon='TRIA_LEFT', text='')
+        row.operator('render_presets.next_state', icon='TRIA_RIGHT', text='')
         row.operator('render_presets.restore_from_backup', icon='LOOP_BACK', text='')
+        presets = context.window_manager.render_presets_presets
+        if 0 <= context.window_manager.render_presets_active_preset < len(presets):
+            row = layout.row(align=True)
+            row.prop(presets[context.window_manager.render_presets_active_preset], 'sections', icon_only=True)
+        if context.preferences.addons[__package__].preferences.profiling:
+            layout.operator('render_presets.profile_last_operation', icon='TIME')
+        if context.window_manager.render_presets_batch_render_summary:
+            layout.label(text=context.window_manager.render_presets_batch_render_summary, icon='TIME')
 
 
 class RENDER_PRESETS_UL_presets_list(UIList):
@@ -47,6 +58,13 @@ class RENDER_PRESETS_UL_presets_list(UIList):
         layout.operator('render_presets.preset_to_scene', icon='RESTRICT_VIEW_ON', text='').preset_id = index
         layout.separator()
         layout.prop(data=item, property='camera', text='')
+        layout.prop(
+            data=item,
+            property='render_animation',
+            text='',
+            icon='RENDER_ANIMATION' if item.render_animation else 'RENDER_STILL',
+            emboss=False
+        )
         layout.prop(
             data=item,
             property='locked',
@@ -5,8 +5,10 @@
 #   https://github.com/Korchy/blender_b_presets
 
 from bpy.types import AddonPreferences
-from bpy.props import StringProperty, BoolProperty
+from bpy.props import StringProperty, BoolProperty, IntProperty, EnumProperty, FloatProperty
 from bpy.utils import register_class, unregister_class
+from .render_presets_cache import RenderPresetsCache
+from .render_presets import RenderPresets
 
 
 class RENDER_PRESETS_preferences(AddonPreferences):
@@ -25,18 +27,141 @@ class RENDER_PRESETS_preferences(AddonPreferences):
         default='//presets_output/'
     )
 
+    batch_render_workers: IntProperty(
+        name='Batch render workers',
+        description='Number of background Blender processes for the batch render. 0 - render in the current session',
+        default=0,
+        min=0
+    )
+
+    batch_render_reorder: BoolProperty(
+        name='Optimize presets order',
+        description='Render presets in the order which minimizes render engine, device and shaders switching',
+        default=True
+    )
+
+    batch_render_skip_rendered: BoolProperty(
+        name='Skip rendered presets',
+        description='Do not render presets which output is up to date (preset, .blend file and camera are not '
+                    'changed since the last batch render). Allows to continue the interrupted batch render',
+        default=False
+    )
+
     use_active_view_layer: BoolProperty(
         default=True,
         name='Save active view layer settings'
     )
 
+    apply_changed_only: BoolProperty(
+        default=True,
+        name='Apply only changed properties',
+        description='Write to the scene only properties which values differ from the preset'
+    )
+
+    preset_cache_size: IntProperty(
+        name='Presets cache size (Mb)',
+        description='Memory limit for the loaded presets cache',
+        default=64,
+        min=0
+    )
+
+    history_steps: IntProperty(
+        name='History steps',
+        description='Maximum number of applied presets to step back through',
+        default=32,
+        min=1
+    )
+
+    history_memory_size: IntProperty(
+        name='History memory (Mb)',
+        description='Memory limit for the applied presets history',
+        default=16,
+        min=1
+    )
+
+    preset_file_format: EnumProperty(
+        name='Presets format',
+        description='File format for the new presets',
+        items=[
+            ('JSON', 'JSON', 'Human readable json files'),
+            ('COMPACT', 'Compact', 'Compressed binary files, smaller and faster to load')
+        ],
+        default='JSON'
+    )
+
+    watch_presets_dir: BoolProperty(
+        name='Watch presets directory',
+        description='Reload presets list when presets are added, removed or changed in the presets directory',
+        default=False,
+        update=lambda self, context: self._on_watch_presets_dir_update(
+            self=self,
+            context=context
+        )
+    )
+
+    watch_presets_dir_interval: FloatProperty(
+        name='Interval (sec)',
+        description='Presets directory checking interval',
+        default=5.0,
+        min=0.5
+    )
+
+    @staticmethod
+    def _on_watch_presets_dir_update(self, context):
+        if self.watch_presets_dir:
+            RenderPresets.start_watching_presets_folder(first_interval=self.watch_presets_dir_interval)
+
+    profiling: BoolProperty(
+        name='Profiling',
+        description='Profile presets loading, saving and applying (developer)',
+        default=False
+    )
+
+    profiling_format: EnumProperty(
+        name='Profile format',
+        items=[
+            ('PSTATS', 'Stats', 'Python profiler stats sorted by the cumulative time', 'TEXT', 0),
+            ('SPEEDSCOPE', 'Speedscope', 'Functions calls trace for the speedscope.app', 'TIME', 1)
+        ],
+        default='PSTATS'
+    )
+
     def draw(self, context):
         layout = self.layout
         layout.prop(self, 'presets_dir')
+        row = layout.row()
+        row.prop(self, 'watch_presets_dir')
+        row.prop(self, 'watch_presets_dir_interval')
         layout.prop(self, 'batch_render_output_dir')
+        row = layout.row()
+        row.prop(self, 'batch_render_workers')
+        row.prop(self, 'batch_render_reorder')
+        row.prop(self, 'batch_render_skip_rendered')
         layout.label(text='Addition properties:')
         row = layout.row()
         row.prop(self, 'use_active_view_layer', toggle=True)
+        row = layout.row()
+        row.prop(self, 'apply_changed_only', toggle=True)
+        row = layout.row()
+        row.prop(self, 'preset_file_format')
+        row.operator('render_presets.convert_presets', icon='FILE_REFRESH')
+        row = layout.row()
+        row.prop(self, 'preset_cache_size')
+        cache_stats = RenderPresetsCache.stats()
+        row.label(
+            text='hits: ' + str(cache_stats['hits'])
+                 + ', misses: ' + str(cache_stats['misses'])
+                 + ', presets: ' + str(cache_stats['presets'])
+                 + ', ' + str(round(cache_stats['size'] / 1024 / 1024, 2)) + ' Mb'
+        )
+        row = layout.row()
+        row.prop(self, 'history_steps')
+        row.prop(self, 'history_memory_size')
+        if context.preferences.view.show_developer_ui:
+            row = layout.row()
+            row.prop(self, 'profiling')
+            row.prop(self, 'profiling_format', text='')
+            row.operator('render_presets.profile_last_operation', icon='TIME')
 
 
 def register():
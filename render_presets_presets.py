@@ -5,11 +5,22 @@
 #   https://github.com/Korchy/blender_b_presets
 
 import bpy
-from bpy.props import CollectionProperty, StringProperty, IntProperty, BoolProperty, PointerProperty
+from bpy.props import CollectionProperty, StringProperty, IntProperty, BoolProperty, PointerProperty, EnumProperty
 from bpy.types import PropertyGroup, WindowManager, Object
 from bpy.utils import register_class, unregister_class
 import re
 from .render_presets import RenderPresets
+from .render_presets_registry import RenderPresetsRegistry
+
+
+_sections_items = [
+    ('SCENE', 'Scene', 'Scene settings (frames range, units, ...)', 'SCENE_DATA', 1),
+    ('RENDER', 'Render', 'Render engines and output settings', 'RESTRICT_RENDER_OFF', 2),
+    ('COLOR_MANAGEMENT', 'Color Management', 'Color management settings', 'COLOR', 4),
+    ('WORLD', 'World', 'World settings', 'WORLD', 8),
+    ('VIEWPORT', 'Viewport', '3D Viewport shading and overlays', 'VIEW3D', 16),
+    ('VIEW_LAYER', 'View Layer', 'Active view layer settings', 'RENDERLAYERS', 32)
+]
 
 
 class RENDER_PRESETS_presets_list(PropertyGroup):
@@ -26,7 +37,11 @@ class RENDER_PRESETS_presets_list(PropertyGroup):
     )
 
     checked: BoolProperty(
-        default=False
+        default=False,
+        update=lambda self, context: RenderPresetsRegistry.set_checked(
+            name=self.name,
+            checked=self.checked
+        )
     )
 
     locked: BoolProperty(
@@ -53,6 +68,34 @@ class RENDER_PRESETS_presets_list(PropertyGroup):
         type=Object
     )
 
+    render_animation: BoolProperty(
+        name='Render Animation',
+        description='Render frames range from the preset in batch render',
+        default=False,
+        update=lambda self, context: self._on_render_animation_update(
+            self=self,
+            context=context
+        )
+    )
+
+    sections: EnumProperty(
+        name='Sections',
+        description='Settings captured to the preset and applied from it',
+        items=_sections_items,
+        options={'ENUM_FLAG'},
+        default=set(RenderPresets.sections),
+        update=lambda self, context: self._on_sections_update(
+            self=self,
+            context=context
+        )
+    )
+
+    sections_old: EnumProperty(
+        items=_sections_items,
+        options={'ENUM_FLAG'},
+        default=set(RenderPresets.sections)
+    )
+
     loaded: BoolProperty(
         default=False
     )
@@ -67,13 +110,17 @@ class RENDER_PRESETS_presets_list(PropertyGroup):
                 self._restore_name(self, message='Empty name!')
             elif  re.search('[/\\:\*\?«<>\|%!@+]', self.name):
                 self._restore_name(self, message='Unacceptable characters / \\ : * ? « < > | + % @ !')
-            elif context.window_manager.render_presets_presets.keys().count(self.name) > 1:
+            elif RenderPresetsRegistry.contains(self.name):
                 self._restore_name(self, message='Name already existed!')
             else:
                 RenderPresets.change_preset_name(
                     context=context,
                     preset_item=self
                 )
+                RenderPresetsRegistry.rename(old_name=self.name_old, new_name=self.name)
+        elif not self.loaded and self.name != self.name_old:
+            # name set on adding to the list
+            RenderPresetsRegistry.rename(old_name=self.name_old, new_name=self.name)
         self.name_old = self.name
 
     @staticmethod
@@ -108,6 +155,41 @@ class RENDER_PRESETS_presets_list(PropertyGroup):
         self.camera = self.camera_old
         bpy.ops.render_presets.messagebox('INVOKE_DEFAULT', message=message)
 
+    @staticmethod
+    def _on_render_animation_update(self, context):
+        if self.loaded:
+            if self.locked:
+                # restore without writing to the preset file
+                self.loaded = False
+                self.render_animation = not self.render_animation
+                self.loaded = True
+                bpy.ops.render_presets.messagebox('INVOKE_DEFAULT', message='Can\'t change locked preset!')
+            else:
+                RenderPresets.change_preset_render_animation(
+                    context=context,
+                    preset_item=self
+                )
+
+    @staticmethod
+    def _on_sections_update(self, context):
+        if self.loaded and self.sections != self.sections_old:
+            if self.locked:
+                self._restore_sections(self, message='Can\'t change locked preset!')
+            elif not self.sections:
+                self._restore_sections(self, message='At least one section is needed!')
+            else:
+                RenderPresets.change_preset_sections(
+                    context=context,
+                    preset_item=self
+                )
+        self.sections_old = self.sections
+
+    @staticmethod
+    def _restore_sections(self, message=''):
+        # restore sections from sections_old with showing warning message
+        self.sections = self.sections_old
+        bpy.ops.render_presets.messagebox('INVOKE_DEFAULT', message=message)
+
     @staticmethod
     def _on_locked_update(self, context):
         if self.loaded:
@@ -125,9 +207,14 @@ def register():
         name='active preset',
         default=0
     )
+    WindowManager.render_presets_batch_render_summary = StringProperty(
+        name='batch render summary',
+        default=''
+    )
 
 
 def unregister():
+    del WindowManager.render_presets_batch_render_summary
     del WindowManager.render_presets_active_preset
     del WindowManager.render_presets_presets
     unregister_class(RENDER_PRESETS_presets_list)
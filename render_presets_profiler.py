@@ -0,0 +1,159 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Profiling mode (developer)
+#   operations marked with @RenderPresetsProfiler.profiled are profiled if profiling is enabled in the preferences
+#   only the last (outer) operation is kept, it can be saved to a file:
+#       PSTATS - cProfile stats sorted by the cumulative time (.txt) and raw stats (.prof)
+#       SPEEDSCOPE - functions calls trace in the speedscope format (https://www.speedscope.app)
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import tempfile
+import time
+import bpy
+
+
+class RenderPresetsProfiler:
+
+    _depth = 0
+    _last_operation = None
+    _last_profile = None    # cProfile.Profile or (frames, events) for speedscope
+    _last_format = None
+    _last_time = 0.0
+
+    @classmethod
+    def profiled(cls, function):
+        # decorator - profile function call if profiling is enabled
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            file_format = cls._profiling_format()
+            if file_format is None or cls._depth:
+                # disabled or called from other profiled operation
+                return function(*args, **kwargs)
+            cls._depth += 1
+            start_time = time.perf_counter()
+            try:
+                if file_format == 'SPEEDSCOPE':
+                    tracer = _SpeedscopeTracer()
+                    sys.setprofile(tracer.trace)
+                    try:
+                        return function(*args, **kwargs)
+                    finally:
+                        sys.setprofile(None)
+                        cls._last_profile = tracer
+                else:
+                    profile = cProfile.Profile()
+                    try:
+                        return profile.runcall(function, *args, **kwargs)
+                    finally:
+                        cls._last_profile = profile
+            finally:
+                cls._depth -= 1
+                cls._last_time = time.perf_counter() - start_time
+                cls._last_operation = function.__qualname__
+                cls._last_format = file_format
+        return wrapper
+
+    @classmethod
+    def has_last_profile(cls):
+        # there is a profiled operation to save
+        return cls._last_profile is not None
+
+    @classmethod
+    def save_last_profile(cls, dir_path=None):
+        # save last profiled operation to the file, returns file path
+        dir_path = dir_path if dir_path else tempfile.gettempdir()
+        file_path = os.path.join(
+            dir_path,
+            'b_presets_profile_' + cls._last_operation.replace('.', '_') + '_' + time.strftime('%Y%m%d_%H%M%S')
+        )
+        if cls._last_format == 'SPEEDSCOPE':
+            file_path += '.speedscope.json'
+            with open(file=file_path, mode='w', encoding='utf8') as profile_file:
+                json.dump(
+                    cls._last_profile.speedscope(name=cls._last_operation),
+                    profile_file,
+                    ensure_ascii=False
+                )
+        else:
+            cls._last_profile.dump_stats(file_path + '.prof')
+            stats_stream = io.StringIO()
+            pstats.Stats(cls._last_profile, stream=stats_stream).sort_stats('cumulative').print_stats(100)
+            file_path += '.txt'
+            with open(file=file_path, mode='w', encoding='utf8') as profile_file:
+                profile_file.write(
+                    cls._last_operation + ': ' + str(round(cls._last_time * 1000, 3)) + ' ms\n'
+                    + stats_stream.getvalue()
+                )
+        return file_path
+
+    @staticmethod
+    def _profiling_format():
+        # profiling format or None if profiling is disabled
+        addon = bpy.context.preferences.addons.get(__package__) if bpy.context else None
+        if addon and addon.preferences.profiling:
+            return addon.preferences.profiling_format
+        return None
+
+
+class _SpeedscopeTracer:
+    # python functions calls trace (sys.setprofile) in the speedscope "evented" format
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._frames = {}       # (name, file, line): frame index
+        self._events = []
+        self._stack = []
+
+    def trace(self, frame, event, arg):
+        # profile function
+        if event == 'call':
+            code = frame.f_code
+            frame_id = self._frames.setdefault(
+                (code.co_qualname if hasattr(code, 'co_qualname') else code.co_name, code.co_filename, code.co_firstlineno),
+                len(self._frames)
+            )
+            self._stack.append(frame_id)
+            self._events.append({'type': 'O', 'frame': frame_id, 'at': self._now()})
+        elif event == 'return' and self._stack:
+            # returns from the frames opened before the tracing started are skipped
+            self._events.append({'type': 'C', 'frame': self._stack.pop(), 'at': self._now()})
+
+    def speedscope(self, name):
+        # trace in the speedscope file format
+        end = self._events[-1]['at'] if self._events else 0.0
+        events = self._events + [
+            {'type': 'C', 'frame': frame_id, 'at': end} for frame_id in reversed(self._stack)
+        ]
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': name,
+            'exporter': 'B-Presets',
+            'shared': {
+                'frames': [
+                    {'name': frame_name, 'file': frame_file, 'line': frame_line}
+                    for frame_name, frame_file, frame_line in self._frames
+                ]
+            },
+            'profiles': [{
+                'type': 'evented',
+                'name': name,
+                'unit': 'milliseconds',
+                'startValue': 0.0,
+                'endValue': end,
+                'events': events
+            }]
+        }
+
+    def _now(self):
+        # time from the tracing start in milliseconds
+        return (time.perf_counter() - self._start) * 1000
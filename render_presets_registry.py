@@ -0,0 +1,61 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Presets registry - presets list names and states kept in sync with the presets list (render_presets_presets)
+#   for O(1) checks in the UI (poll, names validation) which otherwise scan the whole list on each redraw
+#   only names are stored - list items can be moved in memory by Blender when the list is changed
+
+class RenderPresetsRegistry:
+
+    _names = set()
+    _checked = set()
+
+    @classmethod
+    def rebuild(cls, presets):
+        # fill registry from the presets list
+        cls._names = {preset.name for preset in presets}
+        cls._checked = {preset.name for preset in presets if preset.checked}
+
+    @classmethod
+    def clear(cls):
+        cls._names = set()
+        cls._checked = set()
+
+    @classmethod
+    def remove(cls, name):
+        cls._names.discard(name)
+        cls._checked.discard(name)
+
+    @classmethod
+    def rename(cls, old_name, new_name):
+        # rename preset keeping its states
+        if old_name:
+            cls._names.discard(old_name)
+        cls._names.add(new_name)
+        if old_name in cls._checked:
+            cls._checked.discard(old_name)
+            cls._checked.add(new_name)
+
+    @classmethod
+    def set_checked(cls, name, checked):
+        if checked:
+            cls._checked.add(name)
+        else:
+            cls._checked.discard(name)
+
+    @classmethod
+    def contains(cls, name):
+        # preset with name is in the presets list
+        return name in cls._names
+
+    @classmethod
+    def count(cls):
+        return len(cls._names)
+
+    @classmethod
+    def checked_count(cls):
+        return len(cls._checked)
+
@@ -0,0 +1,94 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Background presets folder scanning
+#   presets folder is scanned and presets index is validated in the worker thread
+#   scanned presets are passed to the main thread through the queue and processed with bpy.app.timers
+#   by small portions, so the UI is not blocked on the slow (network) storages
+
+import queue
+import threading
+import time
+import bpy
+from .render_presets_file_system import RenderPresetsFileSystem
+from .render_presets_index import RenderPresetsIndex
+
+
+class RenderPresetsScanner:
+
+    _queue = queue.Queue()
+    _scan_id = 0
+    _on_entry = None
+    _on_finish = None
+    _process_time = 0.01     # max time (sec) to process scanned presets in one timer call
+    _process_interval = 0.01
+    _running = False    # timers are matched by the function object - bound method is new on each access
+
+    @classmethod
+    def start(cls, presets_folder_path, files_ext: tuple, on_entry, on_finish=None):
+        # start scanning the presets folder
+        #   on_entry(context, file_name, index_entry) - called in the main thread for each preset file
+        #   on_finish(context) - called in the main thread after all preset files are processed
+        # previous scanning results are ignored
+        cls._scan_id += 1
+        cls._on_entry = on_entry
+        cls._on_finish = on_finish
+        threading.Thread(
+            target=cls._scan,
+            kwargs={
+                'scan_id': cls._scan_id,
+                'presets_folder_path': presets_folder_path,
+                'files_ext': files_ext
+            },
+            daemon=True
+        ).start()
+        # one timer for all scans - it processes only the last scan and stops on its end
+        #   persistent - not removed on .blend file loading while scanning
+        if not cls._running:
+            cls._running = True
+            bpy.app.timers.register(cls._process, first_interval=cls._process_interval, persistent=True)
+
+    @classmethod
+    def is_running(cls):
+        # scanning is in progress
+        return cls._running
+
+    @classmethod
+    def _scan(cls, scan_id, presets_folder_path, files_ext):
+        # worker thread - scan presets folder
+        try:
+            for file_name, index_entry in RenderPresetsIndex.entries(
+                    presets_folder_path=presets_folder_path,
+                    files=RenderPresetsFileSystem.files(path=presets_folder_path, files_ext=files_ext)
+            ):
+                cls._queue.put((scan_id, file_name, index_entry))
+        except OSError as exception:
+            print('ERR: ', exception)
+        finally:
+            # scanning finished (the timer waits for it even if scanning failed)
+            cls._queue.put((scan_id, None, None))
+
+    @classmethod
+    def _process(cls):
+        # main thread timer - process scanned presets
+        if not cls._running:
+            return None
+        context = bpy.context
+        process_start = time.perf_counter()
+        while time.perf_counter() - process_start < cls._process_time:
+            try:
+                scan_id, file_name, index_entry = cls._queue.get_nowait()
+            except queue.Empty:
+                return cls._process_interval
+            if scan_id != cls._scan_id:
+                continue
+            if file_name is None:
+                cls._running = False
+                if cls._on_finish:
+                    cls._on_finish(context=context)
+                return None
+            cls._on_entry(context=context, file_name=file_name, index_entry=index_entry)
+        return cls._process_interval
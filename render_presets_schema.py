@@ -0,0 +1,80 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Capture schema - ordered list of the struct attributes to save to preset with their types
+#   built once from bl_rna.properties and cached per struct type
+
+import bpy
+
+
+class RenderPresetsSchema:
+
+    _schemas = {}
+
+    # float arrays wrapped to mathutils types which are not saved to presets
+    _skipped_subtypes = ('EULER', 'QUATERNION', 'MATRIX')
+
+    @classmethod
+    def attributes(cls, render_property, excluded_attributes, first_attributes=None):
+        # returns list of (attribute, attribute_type) for render property
+        first_attributes = [] if first_attributes is None else first_attributes
+        properties = render_property.bl_rna.properties
+        # properties count in key - add-ons can register new properties in runtime
+        key = (
+            render_property.bl_rna.identifier,
+            bpy.app.version,
+            len(properties),
+            excluded_attributes,
+            tuple(first_attributes)
+        )
+        schema = cls._schemas.get(key)
+        if schema is None:
+            schema = cls._schema(
+                properties=properties,
+                excluded_attributes=excluded_attributes,
+                first_attributes=first_attributes
+            )
+            cls._schemas[key] = schema
+        return schema
+
+    @classmethod
+    def clear(cls):
+        # clear schemas cache
+        cls._schemas.clear()
+
+    @classmethod
+    def _schema(cls, properties, excluded_attributes, first_attributes):
+        # build attributes list from struct properties
+        attributes_types = {}
+        for bl_property in properties:
+            attribute = bl_property.identifier
+            if attribute.startswith('bl_') or attribute in excluded_attributes:
+                continue
+            attribute_type = cls._attribute_type(bl_property=bl_property)
+            if attribute_type:
+                attributes_types[attribute] = attribute_type
+        # some attributes need to be processed first because other attributes depends on them
+        attributes = [attribute for attribute in first_attributes if attribute in attributes_types]
+        attributes += sorted(attribute for attribute in attributes_types if attribute not in first_attributes)
+        return [(attribute, attributes_types[attribute]) for attribute in attributes]
+
+    @classmethod
+    def _attribute_type(cls, bl_property):
+        # returns attribute type for saving in preset or None if attribute is not saved
+        if bl_property.type == 'POINTER':
+            if bl_property.fixed_type.identifier == 'CurveMapping':
+                return 'CurveMapping'
+            return None
+        elif bl_property.type == 'COLLECTION' or bl_property.is_readonly:
+            return None
+        elif bl_property.type == 'ENUM':
+            # set as separate type because json doesn't serialize "set" type
+            return 'BLSet' if bl_property.is_enum_flag else 'prop'
+        elif getattr(bl_property, 'array_length', 0) > 0:
+            if bl_property.array_dimensions[1] > 0 or bl_property.subtype in cls._skipped_subtypes:
+                return None
+            return 'bpy_prop_array'
+        return 'prop'
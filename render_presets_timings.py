@@ -0,0 +1,120 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Batch render stages timings
+#   stages (backup, read, apply, render, save, restore) are measured with spans while the batch render is running
+#   nested span time is excluded from the outer span, so stages times sum up to the measured time
+#   (or is included to the outer span without recording nested stages with merge_nested=True)
+#   results are saved to the output directory by presets (csv, json)
+
+import contextlib
+import csv
+import json
+import os
+import time
+from .render_presets_file_system import RenderPresetsFileSystem
+
+
+class RenderPresetsTimings:
+
+    stages = ('backup', 'read', 'apply', 'render', 'save', 'restore', 'worker')
+    preset_name = ''    # preset for the following spans
+
+    _report_file_name = 'b_presets_batch_timings'
+    _active = False
+    _spans = []     # (preset name, stage, time)
+    _stack = []     # opened spans: [start time, nested spans time]
+    _merged = 0     # number of opened spans which merge nested spans
+
+    @classmethod
+    def start(cls):
+        # start collecting spans
+        cls._active = True
+        cls._spans = []
+        cls._stack = []
+        cls._merged = 0
+        cls.preset_name = ''
+
+    @classmethod
+    def stop(cls):
+        # stop collecting spans
+        cls._active = False
+        cls.preset_name = ''
+
+    @classmethod
+    @contextlib.contextmanager
+    def span(cls, stage, merge_nested=False):
+        # measure stage time
+        if not cls._active or cls._merged:
+            yield
+            return
+        opened_span = [time.perf_counter(), 0.0]
+        cls._stack.append(opened_span)
+        cls._merged += merge_nested
+        try:
+            yield
+        finally:
+            cls._merged -= merge_nested
+            cls._stack.pop()
+            span_time = time.perf_counter() - opened_span[0]
+            if cls._stack:
+                cls._stack[-1][1] += span_time
+            cls._spans.append((cls.preset_name, stage, span_time - opened_span[1]))
+
+    @classmethod
+    def add(cls, stage, span_time, preset_name=None):
+        # add stage time measured outside the span (render - between the render start and the render_complete handler)
+        if cls._active:
+            cls._spans.append((cls.preset_name if preset_name is None else preset_name, stage, span_time))
+
+    @classmethod
+    def presets_totals(cls):
+        # stages times by presets {preset name: {stage: time, ...}, ...}
+        totals = {}
+        for preset_name, stage, span_time in cls._spans:
+            preset_totals = totals.setdefault(preset_name, dict.fromkeys(cls.stages, 0.0))
+            preset_totals[stage] += span_time
+        return totals
+
+    @classmethod
+    def totals(cls):
+        # stages times for all presets {stage: time, ...}
+        totals = dict.fromkeys(cls.stages, 0.0)
+        for _, stage, span_time in cls._spans:
+            totals[stage] += span_time
+        return totals
+
+    @classmethod
+    def summary(cls):
+        # short text with stages totals
+        totals = cls.totals()
+        return 'Batch render: ' + str(round(sum(totals.values()), 2)) + ' s (' + ', '.join(
+            stage + ' ' + str(round(stage_time, 2)) for stage, stage_time in totals.items() if stage_time
+        ) + ')'
+
+    @classmethod
+    def save_report(cls, output_dir):
+        # save stages times by presets to the output directory
+        presets_totals = cls.presets_totals()
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+            RenderPresetsFileSystem.write_atomic(
+                file_path=os.path.join(output_dir, cls._report_file_name + '.json'),
+                content=json.dumps({'presets': presets_totals, 'totals': cls.totals()}, indent=4, ensure_ascii=False)
+            )
+            with open(
+                    file=os.path.join(output_dir, cls._report_file_name + '.csv'),
+                    mode='w', encoding='utf8', newline=''
+            ) as report_file:
+                writer = csv.writer(report_file)
+                writer.writerow(('preset', ) + cls.stages + ('total', ))
+                for preset_name, preset_totals in presets_totals.items():
+                    writer.writerow(
+                        (preset_name, ) + tuple(round(preset_totals[stage], 6) for stage in cls.stages)
+                        + (round(sum(preset_totals.values()), 6), )
+                    )
+        except OSError as exception:
+            print('ERR: ', exception)
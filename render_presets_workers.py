@@ -0,0 +1,261 @@
+# Nikita Akimov
+# interplanety@interplanety.org
+#
+# GitHub
+#   https://github.com/Korchy/blender_b_presets
+
+# Parallel batch render with the pool of background Blender processes
+#   a copy of the current .blend file is saved to the temporary directory
+#   each worker process opens it with the command line mode entry point (render_presets_cli), applies one preset,
+#   renders (a chunk of the preset animation frames) and saves the result to the output directory
+#   processes are polled with bpy.app.timers, so the UI is not blocked during the batch render
+
+import glob
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import deque
+import bpy
+from .render_presets import RenderPresets
+from .render_presets_batch_render import BatchRender
+from .render_presets_file_system import RenderPresetsFileSystem
+from .render_presets_manifest import BatchRenderManifest
+from .render_presets_timings import RenderPresetsTimings
+
+
+class BatchRenderWorkers:
+
+    _jobs = None        # deque of jobs to render: (preset name, frames)
+    _workers = []       # running workers: (preset name, frames, process, log file path, start time, result file path)
+    _results = []       # finished jobs: (preset name, frames, return code, render time, error)
+    _tmp_dir = None
+    _blend_copy_path = None
+    _presets_dir = None
+    _output_dir = None
+    _file_format = None
+    _manifest_states = {}
+    _frames_count = 0
+    _frames_finished = 0
+    _frames_done = 0
+    _threads = 0
+    _workers_count = 1
+    _poll_interval = 0.25
+    _running = False    # timers are matched by the function object - bound method is new on each access
+    _timer = None       # registered poller timer
+
+    @classmethod
+    def batch_render_with_presets(cls, context, presets: list, workers_count: int, output_dir=None, file_format=None,
+                                  blocking=False):
+        # start batch render with presets in background Blender processes
+        #   frames of the animation presets are split into chunks to spread them between workers
+        #   blocking - wait for all workers in this call (command line mode, there are no timers in background mode)
+        if presets and not cls.is_running():
+            cls._output_dir = output_dir if output_dir else RenderPresetsFileSystem.abs_path(
+                path=context.preferences.addons[__package__].preferences.batch_render_output_dir
+            )
+            cls._file_format = file_format
+            cls._workers_count = max(1, workers_count)
+            jobs = BatchRender.jobs(context=context, presets=presets)
+            cls._manifest_states = BatchRenderManifest.preset_states(
+                context=context,
+                presets=presets,
+                file_format=file_format
+            )
+            if context.preferences.addons[__package__].preferences.batch_render_skip_rendered:
+                jobs = BatchRenderManifest.not_rendered_jobs(
+                    jobs=jobs,
+                    states=cls._manifest_states,
+                    output_dir=cls._output_dir
+                )
+            if jobs:
+                cls._tmp_dir = tempfile.mkdtemp(prefix='b_presets_')
+                cls._blend_copy_path = os.path.join(cls._tmp_dir, 'batch_render.blend')
+                # relative paths are remapped to the copy location
+                bpy.ops.wm.save_as_mainfile(
+                    filepath=cls._blend_copy_path,
+                    check_existing=False,
+                    copy=True,
+                    relative_remap=True
+                )
+                cls._presets_dir = RenderPresets.presets_folder_path(context=context)
+                # split CPU threads between workers
+                cls._threads = max(1, (os.cpu_count() or 1) // cls._workers_count)
+                cls._jobs = deque(cls._frames_chunks(jobs=jobs))
+                cls._frames_count = len(jobs)
+                cls._frames_finished = 0
+                cls._frames_done = 0
+                cls._workers = []
+                cls._results = []
+                cls._running = True
+                # stages inside the workers are not visible here - only the whole job time is measured
+                RenderPresetsTimings.start()
+                if blocking:
+                    while cls._process() is not None:
+                        time.sleep(cls._poll_interval)
+                else:
+                    # persistent - workers are polled even if other .blend file is opened while rendering
+                    cls._timer = cls._process
+                    bpy.app.timers.register(cls._timer, first_interval=0.0, persistent=True)
+
+    @classmethod
+    def _frames_chunks(cls, jobs: list):
+        # group jobs frames by presets and split animation frames into chunks for workers
+        presets_frames = {}
+        for preset, frame in jobs:
+            presets_frames.setdefault(preset.name, []).append(frame)
+        for preset_name, frames in presets_frames.items():
+            chunk_size = -(-len(frames) // cls._workers_count)
+            for chunk_start in range(0, len(frames), chunk_size):
+                yield preset_name, frames[chunk_start:chunk_start + chunk_size]
+
+    @classmethod
+    def is_running(cls):
+        # batch render is in progress
+        return cls._running
+
+    @classmethod
+    def failed_presets(cls):
+        # presets with failed jobs in the last batch render
+        return [result[0] for result in cls._results if result[2] != 0]
+
+    @classmethod
+    def cancel(cls):
+        # stop batch render - stop polling, terminate all workers and remove temporary files
+        if cls._timer is not None and bpy.app.timers.is_registered(cls._timer):
+            bpy.app.timers.unregister(cls._timer)
+        cls._timer = None
+        for _, _, process, _, _, _ in cls._workers:
+            process.terminate()
+            process.wait()
+        if cls._running:
+            RenderPresetsTimings.stop()
+        if cls._tmp_dir:
+            shutil.rmtree(cls._tmp_dir, ignore_errors=True)
+        cls._workers = []
+        cls._jobs = None
+        cls._running = False
+        cls._manifest_states = {}
+        cls._tmp_dir = None
+        cls._blend_copy_path = None
+
+    @classmethod
+    def _process(cls):
+        # timer - collect finished workers and start new ones
+        for worker in cls._workers[:]:
+            preset_name, frames, process, log_file_path, start_time, result_file_path = worker
+            if process.poll() is not None:
+                cls._workers.remove(worker)
+                # frames rendered before the fail are also saved to the manifest
+                rendered_frames = cls._rendered_frames(result_file_path=result_file_path)
+                cls._frames_finished += len(rendered_frames)
+                cls._update_manifest(preset_name=preset_name, rendered_frames=rendered_frames)
+                error = ''
+                if process.returncode != 0:
+                    error = cls._log_tail(log_file_path=log_file_path)
+                    print('ERR: B-Presets batch render with "' + preset_name + '" failed\n' + error)
+                else:
+                    print('B-Presets batch render with "' + preset_name + '" finished')
+                cls._results.append((preset_name, frames, process.returncode, time.perf_counter() - start_time, error))
+                RenderPresetsTimings.add(stage='worker', span_time=cls._results[-1][3], preset_name=preset_name)
+        while cls._jobs and len(cls._workers) < cls._workers_count:
+            preset_name, frames = cls._jobs.popleft()
+            cls._start_worker(preset_name=preset_name, frames=frames)
+        cls._progress_report()
+        if cls._workers:
+            return cls._poll_interval
+        cls._finish()
+        return None
+
+    @classmethod
+    def _progress_report(cls):
+        # rendered frames progress - finished workers frames and already rendered frames of running workers
+        frames_done = cls._frames_finished + sum(
+            len(cls._rendered_frames(result_file_path=worker[5])) for worker in cls._workers
+        )
+        if frames_done != cls._frames_done:
+            cls._frames_done = frames_done
+            print('B-Presets batch render progress: ' + str(frames_done) + '/' + str(cls._frames_count) + ' frames')
+
+    @classmethod
+    def _start_worker(cls, preset_name, frames: list):
+        # start background Blender process to render with preset
+        worker_id = str(len(cls._results) + len(cls._workers))
+        log_file_path = os.path.join(cls._tmp_dir, 'worker_' + worker_id + '.log')
+        result_file_path = os.path.join(cls._tmp_dir, 'worker_' + worker_id + '.result')
+        frames_args = [] if frames == [None] else ['--frames', ','.join(str(frame) for frame in frames)]
+        file_format_args = ['--format', cls._file_format] if cls._file_format else []
+        with open(file=log_file_path, mode='w', encoding='utf8') as log_file:
+            process = subprocess.Popen(
+                [
+                    bpy.app.binary_path,
+                    '-b', cls._blend_copy_path,
+                    '-t', str(cls._threads),
+                    '--python-exit-code', '1',
+                    '--python-expr',
+                    'import importlib; importlib.import_module(\'' + __package__ + '.render_presets_cli\').main()',
+                    '--',
+                    '--presets', glob.escape(preset_name),
+                    '--presets-dir', cls._presets_dir,
+                    '--output-dir', cls._output_dir,
+                    '--result-file', result_file_path
+                ] + frames_args + file_format_args,
+                stdout=log_file,
+                stderr=subprocess.STDOUT
+            )
+        cls._workers.append((preset_name, frames, process, log_file_path, time.perf_counter(), result_file_path))
+
+    @staticmethod
+    def _rendered_frames(result_file_path):
+        # frames rendered by the worker: [(frame, output file path), ...]
+        #   worker writes a line "frame<tab>output file path" to the result file after each rendered frame
+        try:
+            with open(file=result_file_path, mode='r', encoding='utf8') as result_file:
+                lines = result_file.read().splitlines()
+        except OSError:
+            return []
+        return [
+            (int(frame) if frame else None, output_path)
+            for frame, output_path in (line.split('\t', maxsplit=1) for line in lines if '\t' in line)
+        ]
+
+    @classmethod
+    def _update_manifest(cls, preset_name, rendered_frames: list):
+        # add frames rendered by the worker to the batch render manifest
+        if preset_name in cls._manifest_states:
+            for frame, output_path in rendered_frames:
+                BatchRenderManifest.update(
+                    output_dir=cls._output_dir,
+                    job_key=BatchRenderManifest.job_key(preset_name=preset_name, frame=frame),
+                    preset_state=cls._manifest_states[preset_name],
+                    output_path=output_path
+                )
+
+    @classmethod
+    def _finish(cls):
+        # all presets are rendered
+        failed = cls.failed_presets()
+        print(
+            'B-Presets batch render finished: ' + str(cls._frames_finished) + '/' + str(cls._frames_count)
+            + ' frames rendered, ' + str(len(failed)) + ' jobs failed'
+            + (' (' + ', '.join(failed) + ')' if failed else '')
+        )
+        RenderPresetsTimings.save_report(output_dir=cls._output_dir)
+        bpy.context.window_manager.render_presets_batch_render_summary = RenderPresetsTimings.summary()
+        RenderPresetsTimings.stop()
+        shutil.rmtree(cls._tmp_dir, ignore_errors=True)
+        cls._jobs = None
+        cls._running = False
+        cls._manifest_states = {}
+        cls._tmp_dir = None
+        cls._blend_copy_path = None
+
+    @staticmethod
+    def _log_tail(log_file_path, lines=20):
+        # last lines from the worker log
+        try:
+            with open(file=log_file_path, mode='r', encoding='utf8', errors='replace') as log_file:
+                return ''.join(deque(log_file, maxlen=lines))
+        except OSError:
+            return ''